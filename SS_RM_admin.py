@@ -2,10 +2,20 @@
 import smartsheet
 from smartsheet.exceptions import ApiError
 from datetime import datetime
-from smartsheet_grid import grid
+from smartsheet_grid import grid, is_rate_limit_error, rate_limit_retry_after, smartsheet_client
+from rm_client import RmClient, AsyncRmClient
+from throttle import Throttler
+from disk_cache import DiskCache
+from sheet_state import SheetStateStore
+from reconcile import aggregate_rm_timedata, reconcile_timedata
+from perf import PerfRecorder, endpoint_name
+from scheduler import PhaseScheduler
 import requests
-import json
+import asyncio
+import sys
 import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from globals import *
 import pandas as pd
 from logger import ghetto_logger
@@ -15,18 +25,61 @@ class SmartsheetRmAdmin():
     '''admin for DCT's Resource Management tool that is part of SS'''
     def __init__(self, config):
         self.config = config
+        # defaults, any of these can be overwritten by the config
+        self.rm_fetch_workers = 8
+        self.rm_write_workers = 8
+        # project sheets processed at once in run_proj_metadata_update (1 runs serially)
+        self.proj_workers = 4
+        # phases run_phases runs at once (1 runs them one after the other in the old order)
+        self.phase_workers = 2
+        self.rm_page_size = 1000
+        self.rm_pool_size = 16
+        self.rm_timeout = (10, 60)
+        # runs the rm heavy steps (time entry fetch/posts, project metadata and assignment fetches) on asyncio w/ aiohttp instead of threads,
+        # up to rm_async_concurrency calls in flight (see run_async)
+        self.rm_async = False
+        self.rm_async_concurrency = 16
+        # calls per second, the throttlers back off from these when the apis return 429s
+        self.rm_rate_limit = 10
+        self.ss_rate_limit = 5
+        # rm user/project maps are cached on disk for rm_cache_ttl seconds (0 turns the cache off)
+        self.rm_cache_dir = 'rm_cache'
+        self.rm_cache_ttl = 0
+        self.rm_cache_force_refresh = False
+        # snapshots of the hh2 sheet kept between runs so it can be refreshed incrementally (0 turns this off)
+        self.grid_snapshot_dir = 'grid_snapshots'
+        self.grid_snapshot_ttl = 0
+        # project sheets where neither the sheet nor rm changed since the last in sync check are skipped
+        self.skip_unchanged_projects = True
+        self.sheet_state_path = 'sheet_state.json'
+        self.base_url='https://api.rm.smartsheet.com'
+        self.ss_api_base='https://api.smartsheet.com/2.0'
+        # lines below this level (debug < info < warning < error) are not logged
+        self.log_level = 'info'
+        # json report of where the run spent its time (see perf.PerfRecorder), written at the end of __main__
+        self.perf_report_path = 'perf_report.json'
         self.apply_config(config)
         grid.token=self.smartsheet_token
-        self.smart = smartsheet.Smartsheet(access_token=self.smartsheet_token)
-        self.smart.errors_as_exceptions(True)
+        grid.api_base=self.ss_api_base
+        # one throttler per api token, shared by every grid and by this class's own sdk calls
+        grid.throttler = Throttler(rate=self.ss_rate_limit, is_rate_limited=is_rate_limit_error, retry_after=rate_limit_retry_after)
+        grid.snapshot_cache = DiskCache(self.grid_snapshot_dir, self.grid_snapshot_ttl)
+        # one recorder for the whole run, rm calls, grid calls and the phases all land in it
+        self.perf = PerfRecorder()
+        grid.perf = self.perf
+        self.smart = smartsheet_client(self.smartsheet_token, self.ss_api_base)
         self.start_time = time.time()
-        self.log=ghetto_logger("SS_RM_admin.py")
-        self.rm_header = {
-            'Content-Type': 'application/json',
-            'auth': self.rm_token
-        }
+        self.log=ghetto_logger("SS_RM_admin.py", level=self.log_level)
         self.error_w_hh2sheet = []
-        self.base_url='https://api.rm.smartsheet.com'
+        # guards the counters/lists that the parallel rm writes share
+        self.rm_write_lock = threading.Lock()
+        self.rm_cache = DiskCache(self.rm_cache_dir, self.rm_cache_ttl)
+        # one snapshot per (endpoint, params) for the listings we pull more than once a run, see paginated_rm_getrequest(memoize=True)
+        self.rm_memo = {}
+        self.rm_memo_lock = threading.Lock()
+        self.sheet_state = SheetStateStore(self.sheet_state_path)
+        # every rm call goes through this client so connections are pooled/reused
+        self.rm = RmClient(self.rm_token, base_url=self.base_url, pool_size=max(self.rm_pool_size, self.rm_fetch_workers, self.rm_write_workers), timeout=self.rm_timeout, throttler=Throttler(rate=self.rm_rate_limit), perf=self.perf)
     #region helpers
     def apply_config(self, config):
         '''turns all config items into self.key = value'''
@@ -46,32 +99,90 @@ class SmartsheetRmAdmin():
             if column !='id' and column not in correct_columns:
                 incorrect_columns.append(column)
         return incorrect_columns  # If all cells are contained, return True
-    def paginated_rm_getrequest(self, endpoint, params=None):
+    def paginated_rm_getrequest(self, endpoint, params=None, memoize=False):
         """
         Fetches data from an API endpoint. Handles both single item and paginated responses.
 
         :param endpoint: The specific endpoint to fetch data from.
         :param headers: Dictionary containing request headers.
         :param params: Dictionary containing any query parameters for the GET request.
+        :param memoize: Reuse the result of the same endpoint/params from earlier in this run (see invalidate_rm_directory).
         :return: A single item or a list of items aggregated from all pages.
         """
-        url = f"{self.base_url}{endpoint}"
+        return self.rm_getrequest_with_status(endpoint, params, memoize)[0]
+    def rm_getrequest_with_status(self, endpoint, params=None, memoize=False):
+        '''paginated_rm_getrequest, but returns (result, complete), complete is False when a page failed (the result is then [] or only the pages before it)
+        only complete, non empty results are memoized, so one bad page can't stick around for the rest of the run'''
+        if memoize:
+            memo_key = (endpoint, tuple(sorted((params or {}).items())))
+            with self.rm_memo_lock:
+                snapshot = self.rm_memo.get(memo_key)
+            if snapshot is not None:
+                self.perf.count('rm_memo_hits')
+                complete = True
+            else:
+                snapshot, complete = self.rm_getrequest_with_status(endpoint, params)
+                if snapshot and complete:
+                    with self.rm_memo_lock:
+                        self.rm_memo[memo_key] = snapshot
+            # callers edit the items they get back (ie project_code trimming), so hand out copies
+            if isinstance(snapshot, list):
+                return [dict(item) for item in snapshot], complete
+            return dict(snapshot), complete
+        url = endpoint
         items = []
-        while url:
-            response = requests.get(url, headers=self.rm_header, params=params)
-            if response.status_code == 200:
-                response_json = response.json()
-                # Check if response is paginated
-                if 'data' in response_json:
-                    items.extend(response_json.get('data', []))
-                    next_page = response_json.get('paging', {}).get('next')
-                    url = f"{self.base_url}{next_page}" if next_page and not next_page.startswith('http') else next_page
+        # the whole listing (every page) is one call in the perf report, the single pages are under the rm client's own entries
+        with self.perf.timed('rm_listing', endpoint_name(endpoint)) as info:
+            while url:
+                response = self.rm.get(url, params=params)
+                if response.status_code == 200:
+                    response_json = response.json()
+                    # Check if response is paginated
+                    if 'data' in response_json:
+                        items.extend(response_json.get('data', []))
+                        info['rows'] = len(items)
+                        next_page = response_json.get('paging', {}).get('next')
+                        url = next_page
+                        # the next page link already carries the query string, so params only go on the first request
+                        params = None
+                    else:
+                        return response_json, True  # Return a single item
                 else:
-                    return response_json  # Return a single item
-            else:
-                self.log.log(f"Failed to fetch data: {response.status_code} - {response.reason}")
-                break  # Exit loop on failure
+                    self.log.log(f"Failed to fetch data: {response.status_code} - {response.reason}", level='error')
+                    info['error'] = True
+                    return items, False  # Exit loop on failure
+        return items, True
+    async def paginated_rm_getrequest_async(self, arm, endpoint, params=None):
+        '''paginated_rm_getrequest (w/o memoize) on arm, an AsyncRmClient, the pages of one listing still come one after the other'''
+        url = endpoint
+        items = []
+        with self.perf.timed('rm_listing', endpoint_name(endpoint)) as info:
+            while url:
+                response = await arm.get(url, params=params)
+                if response.status_code == 200:
+                    response_json = response.json()
+                    if 'data' in response_json:
+                        items.extend(response_json.get('data', []))
+                        info['rows'] = len(items)
+                        url = response_json.get('paging', {}).get('next')
+                        params = None
+                    else:
+                        return response_json
+                else:
+                    self.log.log(f"Failed to fetch data: {response.status_code} - {response.reason}", level='error')
+                    info['error'] = True
+                    break
         return items if items else []
+    def run_async(self, coro_fn, *args):
+        '''runs coro_fn(arm, *args) to the end from sync code, arm is an AsyncRmClient made for this run (an aiohttp session can't outlive its event loop)
+        it shares the sync client's throttler, so both stay inside the one rm rate limit'''
+        async def main():
+            arm = AsyncRmClient(self.rm_token, base_url=self.base_url, concurrency=self.rm_async_concurrency, timeout=self.rm_timeout, throttler=self.rm.throttler, perf=self.perf)
+            try:
+                return await coro_fn(arm, *args)
+            finally:
+                await arm.close()
+        return asyncio.run(main())
     def convert_date_format(self, original_date, ss_format = False):
         '''converst YEAR-0DAY-0MONTH to day/month/year, SS_format refers to how it shows up in SS for making corresponding strings (with leading zeros and 2 digit years)'''
         year, month, day = original_date.split('-')
@@ -100,7 +211,7 @@ class SmartsheetRmAdmin():
                 except KeyError:
                     pass
         else:
-            self.log.log('error with grabbing emails from sheet...')
+            self.log.log('error with grabbing emails from sheet...', level='error')
     def find_email_index(self, data, df):
         '''OUTDATED used to find the column index that has PRIMARY DCT so I can grab emails via requests library and column index (and use this to filter out emails that are not already in RM)'''
         for row in data['rows']:
@@ -108,53 +219,100 @@ class SmartsheetRmAdmin():
                 if isinstance(cell.get('objectValue'), dict):
                     if cell.get('objectValue').get('name') == df['PRIMARY DCT'].tolist()[0]:
                         return i
-    def grab_rm_userids(self):
-        '''grabs each user's id, this will help with allocating hours to users correctly'''
-        response_dict = self.paginated_rm_getrequest(endpoint='/api/v1/users')
-
-        self.rm_user_list=[]
-        self.sageid_to_email={}
-        self.userid_to_email={}
-        self.email_to_userid={}
-        self.email_to_sageid = {}
+    def grab_rm_userids(self, force_refresh=False):
+        '''grabs each user's id, this will help with allocating hours to users correctly
+        the resulting maps come from the disk cache when it is fresh, unless force_refresh (or rm_cache_force_refresh) is set'''
+        user_maps = None if (force_refresh or self.rm_cache_force_refresh) else self.rm_cache.load('users')
+        if user_maps is None:
+            response_dict, complete = self.rm_getrequest_with_status(endpoint='/api/v1/users', memoize=not force_refresh)
+            user_maps = self.build_rm_user_maps(response_dict)
+            # a failed or half fetched listing is used for this run only, caching it would hide users until the ttl runs out
+            if complete and response_dict:
+                self.rm_cache.save('users', user_maps)
+            else:
+                self.log.log("the RM user listing came back incomplete, not caching it", level='warning')
+        # assigned all at once so nothing sees half built maps
+        for key, value in user_maps.items():
+            setattr(self, key, value)
+    def build_rm_user_maps(self, response_dict):
+        '''turns the rm user listing into the user list + lookup dicts'''
+        rm_user_list=[]
+        sageid_to_email={}
+        userid_to_email={}
+        email_to_userid={}
+        email_to_sageid = {}
         for user in response_dict:
             if user['email'] is not None:
-                self.rm_user_list.append({'email': user['email'].lower(), 'rm_usr_id':  user['id'], 'name': user['display_name'], 'sage id': user['employee_number']})
-                self.sageid_to_email[user['employee_number']] = user['email'].lower()
-                self.email_to_sageid[user['email'].lower()] = user['employee_number']
-                self.userid_to_email[user['id']] = user['email'].lower()
-                self.email_to_userid[user['email'].lower()] = user['id']
-    def grab_rm_projids(self):
+                rm_user_list.append({'email': user['email'].lower(), 'rm_usr_id':  user['id'], 'name': user['display_name'], 'sage id': user['employee_number']})
+                sageid_to_email[user['employee_number']] = user['email'].lower()
+                email_to_sageid[user['email'].lower()] = user['employee_number']
+                userid_to_email[user['id']] = user['email'].lower()
+                email_to_userid[user['email'].lower()] = user['id']
+        return {'rm_user_list': rm_user_list, 'sageid_to_email': sageid_to_email, 'userid_to_email': userid_to_email, 
+                'email_to_userid': email_to_userid, 'email_to_sageid': email_to_sageid}
+    def grab_rm_projids(self, force_refresh=False):
         '''grabs each project's id from RM in SS, also makes dict that can translate rm_id to job number for time & expense
+        the resulting maps come from the disk cache when it is fresh, unless force_refresh (or rm_cache_force_refresh) is set'''
+        proj_maps = None if (force_refresh or self.rm_cache_force_refresh) else self.rm_cache.load('projects')
+        # maps cached before archived_proj was part of them count as a miss
+        if proj_maps is None or 'archived_proj' not in proj_maps:
+            response_dict, complete = self.rm_getrequest_with_status(endpoint='/api/v1/projects?sort_field=created&sort_order=ascending&with_archived=true', memoize=not force_refresh)
+            proj_maps = self.build_rm_proj_maps(response_dict)
+            if complete and response_dict:
+                self.rm_cache.save('projects', proj_maps)
+            else:
+                self.log.log("the RM project listing came back incomplete, not caching it", level='warning')
+        # built here (not cached) so maps from an older cache get one too
+        proj_maps = {**proj_maps, 'rm_proj_name_index': self.build_rm_proj_name_index(proj_maps['rm_proj_list'])}
+        for key, value in proj_maps.items():
+            setattr(self, key, value)
+    def build_rm_proj_name_index(self, rm_proj_list):
+        '''{project name: (position in rm_proj_list, rm id)}, keeping the first project w/ each name, for establish_sheet_connection'''
+        rm_proj_name_index = {}
+        for position, rm_proj in enumerate(rm_proj_list):
+            rm_proj_name_index.setdefault(rm_proj['project name'], (position, rm_proj['rm_proj_id']))
+        return rm_proj_name_index
+    def build_rm_proj_maps(self, response_dict):
+        '''turns the rm project listing into the project list + lookup dicts
         I added the "orange" "leavetype" projects from rm so I need to append those to the objects so they are added 8.5.24'''
-        response_dict = self.paginated_rm_getrequest(endpoint='/api/v1/projects?sort_field=created&sort_order=ascending&with_archived=true')
-
-        self.rm_proj_list=[]
-        self.rm_id_to_jobnum = {}
-        self.jobnum_to_rm_id = {}
+        rm_proj_list=[]
+        rm_id_to_jobnum = {}
+        jobnum_to_rm_id = {}
         # for me lol
-        self.jobnum_to_name={}
+        jobnum_to_name={}
+        # kept w/ the maps so update_archived_projects can run off the cache
+        archived_proj = []
         for proj in response_dict:
+            if proj['archived']:
+                archived_proj.append({'id': proj['id'], 'name': proj['name'], 'archived': proj['archived']})
             if proj['name'] != "":
                 original_jobnumn = proj['project_code']
                 if isinstance(original_jobnumn, str):
                     if original_jobnumn.find('.') != -1:
                         proj['project_code'] = original_jobnumn[:original_jobnumn.find('.')]
-                    self.jobnum_to_name[proj['project_code']]=proj['name']
-                    self.jobnum_to_rm_id[proj['project_code']] = proj['id']
+                    jobnum_to_name[proj['project_code']]=proj['name']
+                    jobnum_to_rm_id[proj['project_code']] = proj['id']
                 else:
                     pass
 
-                self.rm_proj_list.append({'project name':proj['name'],  'job number':proj['project_code'], 'rm_proj_id':proj['id']})
-                self.rm_id_to_jobnum[proj['id']] = proj['project_code']  
+                rm_proj_list.append({'project name':proj['name'],  'job number':proj['project_code'], 'rm_proj_id':proj['id']})
+                rm_id_to_jobnum[proj['id']] = proj['project_code']  
 
-        self.rm_proj_list.append({'project name':'PTO',  'job number':'PTO', 'rm_proj_id':self.rm_leave_type_ids["Vacation"]})
-        self.rm_id_to_jobnum[self.rm_leave_type_ids["Vacation"]] = 'PTO'
-        self.jobnum_to_rm_id['PTO'] = self.rm_leave_type_ids["Vacation"]
-        self.rm_proj_list.append({'project name':'Parental Leave',  'job number':'PARELEAVE', 'rm_proj_id':self.rm_leave_type_ids["Parental Leave"]})
-        self.rm_id_to_jobnum[self.rm_leave_type_ids["Parental Leave"]] = 'PARELEAVE'  
-        self.jobnum_to_rm_id[proj['project_code']] = proj['id']
-        self.jobnum_to_rm_id['PARELEAVE'] = self.rm_leave_type_ids["Parental Leave"]
+        rm_proj_list.append({'project name':'PTO',  'job number':'PTO', 'rm_proj_id':self.rm_leave_type_ids["Vacation"]})
+        rm_id_to_jobnum[self.rm_leave_type_ids["Vacation"]] = 'PTO'
+        jobnum_to_rm_id['PTO'] = self.rm_leave_type_ids["Vacation"]
+        rm_proj_list.append({'project name':'Parental Leave',  'job number':'PARELEAVE', 'rm_proj_id':self.rm_leave_type_ids["Parental Leave"]})
+        rm_id_to_jobnum[self.rm_leave_type_ids["Parental Leave"]] = 'PARELEAVE'  
+        jobnum_to_rm_id[proj['project_code']] = proj['id']
+        jobnum_to_rm_id['PARELEAVE'] = self.rm_leave_type_ids["Parental Leave"]
+        return {'rm_proj_list': rm_proj_list, 'rm_id_to_jobnum': rm_id_to_jobnum, 'jobnum_to_rm_id': jobnum_to_rm_id, 'jobnum_to_name': jobnum_to_name, 'archived_proj': archived_proj}
+    def invalidate_rm_directory(self, name):
+        '''name is 'users' or 'projects', call after we change them in rm ourselves 
+        so the next grab re-downloads instead of using the disk cache or this run's memo'''
+        self.rm_cache.invalidate(name)
+        with self.rm_memo_lock:
+            for memo_key in [memo_key for memo_key in self.rm_memo if memo_key[0].startswith(f"/api/v1/{name}")]:
+                del self.rm_memo[memo_key]
     def custom_round(self, n, digits):
         '''python does not round as I'd expect and it needs to be a perfect match with the round on SS so had to make custom (using chatGPT)'''
         # Scale the number to keep the part we're interested in as an integer.
@@ -197,10 +355,11 @@ class SmartsheetRmAdmin():
                 'employee_number': self.sage_id_dict[user['email'].lower()]
             }
 
-            response = requests.put(f"https://api.rm.smartsheet.com/api/v1/users/{user['rm_usr_id']}", headers=self.rm_header, data=json.dumps(data))
+            response = self.rm.put(f"/api/v1/users/{user['rm_usr_id']}", data)
 
             if response.status_code == 200:
                 self.log.log(f"Added EmpployeeNumber to {user['name']}'s user data")
+                self.invalidate_rm_directory('users')
 
             response_dict = response.json()
     def audit_users_emplnum(self):
@@ -214,34 +373,38 @@ class SmartsheetRmAdmin():
         if len(self.needs_emplnum_update) > 0: 
             self.grab_sage_id_dict()
             self.post_user_emplnum()
-            time.sleep(5)
             self.grab_rm_userids()
         #endregion 
     def fetch_and_prepare_hh2_data(self):
-        '''grabs the hh2 data from ss, then cleans the df and creates a list of dict records
+        '''grabs the hh2 data from ss, then cleans the df and creates a list of dict records'''
+        df = self.load_hh2_data()
+        if df is not None:
+            self.flat_hh2_records = self.aggregate_hh2_data(df)
+    def load_hh2_data(self):
+        '''grabs the hh2 data from ss and cleans it, returns the df (not aggregated yet) or None if the sheet failed validation (noted in error_w_hh2sheet)
         I have to replace Jobs with resulting Jobs because Katherine added jobs that are the results of certain data conditions, not from hh2 8.5.24'''
-        sheet = grid(self.hh2_data_sheetid)
-        sheet.fetch_content()
-        df = sheet.df
-        self.scriptkey_to_script_message = pd.Series(df['Script Message'].values,index=df['Script Key']).to_dict()
-
         columns_to_keep = [
             'EmployeeNumber', 'EmployeeName', 'Date', 'PayrollGroup', 'PayrollServiceId',
             'Job', 'JobName', 'CostCode', 'CostCodeName', 'CertifiedClass', 'CertifiedClassName',
             'PayType', 'PayTypeName', 'Units', 'Description', 'ApprovalType', 'id'
         ]
+        sheet = grid(self.hh2_data_sheetid, incremental=True)
+        # only pull the columns this script reads ('id' is the row id, not a column)
+        sheet.fetch_content(column_titles=columns_to_keep[:-1] + ['Resulting Job Number', 'Script Key', 'Script Message'])
+        df = sheet.df
+        self.scriptkey_to_script_message = pd.Series(df['Script Message'].values,index=df['Script Key']).to_dict()
+
         df['Job'] = df['Resulting Job Number']
         df = df.filter(columns_to_keep)
 
         invalid_column_list = self.validate_and_contains_first_row(df)
 
         if invalid_column_list == []:
-            df = self.clean_df_for_processing(df)
-            self.flat_hh2_records = self.aggregate_hh2_data(df)
+            return self.clean_df_for_processing(df)
         else: 
             self.error_w_hh2sheet.append(f"First row validation failed (so script did not run properly). Please check {invalid_column_list} columns. ({self.generate_now_string()})")
-            self.log.log(f'HH2 Sheet error: please check the following column(s) {invalid_column_list} at https://app.smartsheet.com/sheets/GffHvGGxVJwQ9P8w8gwgfqrmJjcq39JXvMQmH7q1?view=grid&filterId=3306346053062532')
-            self.log.log('if this is a new column, add it to df.drop in fetch_and_prepare_hh2_data(self)')
+            self.log.log(f'HH2 Sheet error: please check the following column(s) {invalid_column_list} at https://app.smartsheet.com/sheets/GffHvGGxVJwQ9P8w8gwgfqrmJjcq39JXvMQmH7q1?view=grid&filterId=3306346053062532', level='warning')
+            self.log.log('if this is a new column, add it to df.drop in fetch_and_prepare_hh2_data(self)', level='warning')
             return None  # Return to avoid further processing
     def clean_df_for_processing(self, df):
         '''cleans incoming hh2 data from smartsheet'''
@@ -251,115 +414,161 @@ class SmartsheetRmAdmin():
         df['Description'] = df['Description'].astype(str)
         df['Units'] = pd.to_numeric(df['Units'], errors='coerce')
         return df
-    def aggregate_hh2_data(self, df):
+    def hh2_date_window(self, df):
+        '''(first, last) date (YYYY-MM-DD) of the rows aggregate_hh2_data keeps (sealed, w/ a job, from an rm user), so the rm time entries can be fetched before the rows are aggregated'''
+        kept = df['ApprovalType'].isin(['Sealed', None]) & df['Job'].notna() & df['EmployeeNumber'].notna() & df['EmployeeNumber'].map(self.sageid_to_email).notna()
+        dates = df.loc[kept, 'Date'].dropna()
+        if dates.empty:
+            return None, None
+        return dates.min().strftime('%Y-%m-%d'), dates.max().strftime('%Y-%m-%d')
+    def aggregate_hh2_data(self, df, jobnum_to_rm_id=None):
         '''Filter by approval type, then turn the df into a dict with records,
-        making sure to add all units in case there are two entries for the same day/job number'''
+        making sure to add all units in case there are two entries for the same day/job number
+        everything is done on whole columns (named aggs, .map lookups, .dt date parts), no per row python until the records are made
+        jobnum_to_rm_id defaults to the one from the last grab_rm_projids'''
+        jobnum_to_rm_id = self.jobnum_to_rm_id if jobnum_to_rm_id is None else jobnum_to_rm_id
         
         # Filter the DataFrame
         filtered_df = df[df['ApprovalType'].isin(['Sealed', None])]
     
         # Select only the necessary columns for aggregation
         columns_to_aggregate = ['Job', 'Date', 'EmployeeNumber', 'Units', 'Description', 'CostCodeName']
-        filtered_df = filtered_df[columns_to_aggregate]
+        filtered_df = filtered_df[columns_to_aggregate].copy()
         
-        # Replace None with empty strings in 'Description' and 'CostCodeName' columns
-        filtered_df['Description'] = filtered_df['Description'].fillna('')
-        filtered_df['CostCodeName'] = filtered_df['CostCodeName'].fillna('')
+        # Replace None with empty strings in 'Description' and 'CostCodeName' columns, 
+        # and end every value w/ its separator so a plain (built in) sum joins them, the last separator is cut off after
+        filtered_df['Description'] = filtered_df['Description'].fillna('').astype(str) + ' '
+        filtered_df['CostCodeName'] = filtered_df['CostCodeName'].fillna('').astype(str) + ' | '
     
         grouped = filtered_df.groupby(
             ['Job', 'Date', 'EmployeeNumber']
-        ).agg({
-            'Units': 'sum',
-            'Description': lambda x: ' '.join(x),
-            'CostCodeName': lambda x: ' | '.join(x)
-        }).reset_index()
+        ).agg(
+            Units=('Units', 'sum'),
+            Description=('Description', 'sum'),
+            CostCodeName=('CostCodeName', 'sum'),
+        ).reset_index()
+        grouped['Description'] = grouped['Description'].str[:-len(' ')]
+        grouped['CostCodeName'] = grouped['CostCodeName'].str[:-len(' | ')]
     
-        # Assuming EmployeeNumber to email mapping is preprocessed if possible
-        # For direct transformation without .iterrows()
-        grouped['user'] = grouped['EmployeeNumber'].map(self.sageid_to_email).fillna('default_email@example.com')
+        grouped['user'] = grouped['EmployeeNumber'].map(self.sageid_to_email)
 
-        # Filter out rows where 'user' is 'default_email@example.com'
-        grouped = grouped[grouped['user'] != 'default_email@example.com']
+        # Filter out rows whose employee number isn't an rm user
+        grouped = grouped[grouped['user'].notna()].reset_index(drop=True)
 
-        grouped['date'] = pd.to_datetime(grouped['Date']).dt.date.astype(str)  # Ensuring date format
-        grouped['rm_user_id'] = grouped['user'].apply(
-            lambda x: str(int(self.email_to_userid.get(x.lower()))) if self.email_to_userid.get(x.lower()) is not None else None
-        )
-        grouped['rm_proj_id'] = grouped['Job'].apply(lambda x: self.jobnum_to_rm_id.get(x, ''))
+        dates = pd.to_datetime(grouped['Date'])
+        grouped['date'] = dates.dt.strftime('%Y-%m-%d')  # Ensuring date format
+        # mapping through object series keeps the ids as ints/str (a dict w/ misses would turn them into floats)
+        rm_user_ids = pd.Series({email.lower(): str(int(user_id)) for email, user_id in self.email_to_userid.items() if user_id is not None}, dtype=object)
+        grouped['rm_user_id'] = grouped['user'].str.lower().map(rm_user_ids).astype(object)
+        grouped['rm_user_id'] = grouped['rm_user_id'].where(grouped['rm_user_id'].notna(), None)
+        grouped['rm_proj_id'] = grouped['Job'].map(pd.Series(jobnum_to_rm_id, dtype=object)).fillna('')
     
         # Calculate min and max dates
         self.min_date = grouped['date'].min()
         self.max_date = grouped['date'].max()
+
+        # the same rows as a frame (in the same order as the records below) for process_timedata_discrepencies to match against rm
+        self.hh2_timedata = pd.DataFrame({
+            'user_email': grouped['user'],
+            'date': grouped['date'],
+            'job_num': grouped['Job'],
+            'hours': grouped['Units'],
+            'rm_proj_id': grouped['rm_proj_id'],
+        })
+
+        # script key is <sage id><m/d/yyyy><job>Sealed, w/ the date parts built from ints (strftime's %-m doesn't exist on windows)
+        sage_ids = grouped['user'].map(pd.Series(self.email_to_sageid, dtype=object)).fillna('None').astype(str)
+        short_dates = dates.dt.month.astype(str) + '/' + dates.dt.day.astype(str) + '/' + dates.dt.year.astype(str)
+        grouped['key'] = sage_ids + short_dates + grouped['Job'].astype(str) + 'Sealed'
     
-        # Directly construct the records without explicit row iteration
-        records = grouped.to_dict('records')
-        self.records = records
-    
-        # Transform records into desired format
-        flat_hh2_records = [{
-            "user_email": record['user'],
-            "rm_userid": record['rm_user_id'],
-            "job_num": record['Job'],
-            'rm_proj_id': record['rm_proj_id'],
-            "date": record['date'],
-            "hours": record['Units'],
-            "task": record['CostCodeName'],
-            "notes": record.get('Description'),
-            # "ss_row_id": record['id'],
-            "key": f"{self.email_to_sageid.get(record['user'])}{self.convert_date_format(record['date'])}{record['Job']}Sealed",
-            "messages": []
-        } for record in records]
+        # Transform records into desired format, zipping plain lists is much faster than df.to_dict('records')
+        record_columns = {
+            "user_email": 'user',
+            "rm_userid": 'rm_user_id',
+            "job_num": 'Job',
+            'rm_proj_id': 'rm_proj_id',
+            "date": 'date',
+            "hours": 'Units',
+            "task": 'CostCodeName',
+            "notes": 'Description',
+            # "ss_row_id": 'id',
+            "key": 'key',
+        }
+        names = list(record_columns)
+        flat_hh2_records = [
+            dict(zip(names, values), messages=[])
+            for values in zip(*[grouped[column].tolist() for column in record_columns.values()])
+        ]
     
         return flat_hh2_records
-    def grab_rm_timedata(self):
+    def grab_rm_timedata(self, from_date=None, to_date=None):
         '''grabs existing data from rm, translates rm job id to job number, rm user id to user email, 
-        and then builds out a reference dictionary of time entries (hrs) for verifying if update is needed, adding hours for same job/time as needed
-        and building reference of entry ids w list of ids per entry'''
+        and then builds out a reference frame of time entries (rm_timedata_agg) w/ the hours summed per user/date/job (and the keyed entries, rm_timedata_entries), for verifying if update is needed
+        from_date/to_date (YYYY-MM-DD) default to the min/max date of the hh2 data, so only entries that process_timedata_discrepencies can look at get downloaded'''
+        from_date = from_date or getattr(self, 'min_date', None)
+        to_date = to_date or getattr(self, 'max_date', None)
+        self.build_rm_timedata(self.fetch_rm_timedata(from_date, to_date))
+    def fetch_rm_timedata(self, from_date=None, to_date=None):
+        '''every rm user's time entries between from_date and to_date, one list per user (in rm_user_list order)
+        w/ rm_async they are fetched by fetch_rm_user_timedata_async'''
+        if self.rm_async:
+            return self.run_async(self.fetch_rm_user_timedata_async, self.rm_user_list, from_date, to_date)
+        return self.fetch_rm_user_timedata(self.rm_user_list, from_date, to_date)
+    def build_rm_timedata(self, users_timedata, rm_id_to_jobnum=None):
+        '''flattens the per user time entries (in user order) into current_rm_timedata, and aggregates them
+        rm_id_to_jobnum defaults to the one from the last grab_rm_projids'''
+        rm_id_to_jobnum = self.rm_id_to_jobnum if rm_id_to_jobnum is None else rm_id_to_jobnum
         self.current_rm_timedata = []
-        self.rm_quickreference_hrs = {}
-        self.rm_quickreference_id = {}
-        for user in self.rm_user_list:
-            self.current_rm_timedata.extend(self.paginated_rm_getrequest(f"/api/v1/users/{user['rm_usr_id']}/time_entries"))
-        for timeentry in self.current_rm_timedata:
-            try:
-                timeentry['job_num'] = self.rm_id_to_jobnum[timeentry['assignable_id']]
-            except KeyError:
-                # not longterm solution!
-                timeentry['job_num'] = "no_job_num"
-            timeentry['usr_email'] = self.userid_to_email[timeentry['user_id']]
-            key = f"{timeentry['usr_email'].lower()}{timeentry['date']}{timeentry['job_num']}"
-            if key not in self.rm_quickreference_hrs:
-                self.rm_quickreference_hrs[key] = timeentry['hours']
-                self.rm_quickreference_id[key] = [timeentry['id']]  # Initialize with a list containing the id
-            else:
-                old_number = self.rm_quickreference_hrs[key]
-                self.rm_quickreference_hrs[key] = old_number + timeentry['hours']
-                self.rm_quickreference_id[key].append(timeentry['id'])  # Directly append the new id to the list
+        for user_timedata in users_timedata:
+            self.current_rm_timedata.extend(user_timedata)
+        # entries w/o a job number are grouped under "no_job_num" (not longterm solution!)
+        self.rm_timedata_agg, self.rm_timedata_entries = aggregate_rm_timedata(self.current_rm_timedata, rm_id_to_jobnum, self.userid_to_email)
+    def rm_timedata_params(self, from_date=None, to_date=None):
+        '''query params for a time entry listing, from_date/to_date are passed to rm's date filters, if either is None that side of the window is left open'''
+        params = {'per_page': self.rm_page_size}
+        if from_date and pd.notna(from_date):
+            params['from'] = from_date
+        if to_date and pd.notna(to_date):
+            params['to'] = to_date
+        return params
+    def fetch_rm_user_timedata(self, user_list, from_date=None, to_date=None):
+        '''pulls every user's time entries w/ up to rm_fetch_workers requests in flight at once (1 runs serially)
+        results come back in the same order as user_list so the quickreference dicts are built the same as a serial run'''
+        params = self.rm_timedata_params(from_date, to_date)
+        def fetch(user):
+            return self.paginated_rm_getrequest(f"/api/v1/users/{user['rm_usr_id']}/time_entries", params=dict(params))
+        if self.rm_fetch_workers <= 1:
+            return [fetch(user) for user in user_list]
+        with ThreadPoolExecutor(max_workers=self.rm_fetch_workers) as executor:
+            # executor.map yields in submission order, not completion order
+            return list(executor.map(fetch, user_list))
+    async def fetch_rm_user_timedata_async(self, arm, user_list, from_date=None, to_date=None):
+        '''fetch_rm_user_timedata on arm, every user at once (arm's concurrency bounds the calls in flight), results in user_list order'''
+        params = self.rm_timedata_params(from_date, to_date)
+        return await asyncio.gather(*[
+            self.paginated_rm_getrequest_async(arm, f"/api/v1/users/{user['rm_usr_id']}/time_entries", params=dict(params))
+            for user in user_list])
     def process_timedata_discrepencies(self):
-        '''compare hh2 data (on ss) w/ rm data. The end result is a list of time entries and their needed actions'''
-        up_to_date, to_update, to_add, self.to_add_projntime=0,0,0,0
+        '''compare hh2 data (on ss) w/ rm data. The end result is a list of time entries and their needed actions
+        the matching is done on frames (see reconcile.reconcile_timedata), then the actions are written back onto the records'''
+        reconciled = reconcile_timedata(self.hh2_timedata, self.rm_timedata_agg, self.rm_timedata_entries)
+        self.perf.count('hh2_time_entries', len(reconciled))
+        self.perf.count('rm_time_entries', len(self.current_rm_timedata))
+        is_add = reconciled['action'] == 'add'
+        up_to_date = int((reconciled['action'] == 'current').sum())
+        to_update = int((reconciled['action'] == 'update').sum())
+        to_add = int((is_add & ~reconciled['needs_project']).sum())
+        self.to_add_projntime = int(reconciled['needs_project'].sum())
+        now_string = self.generate_now_string()
         self.undeployed_job_nums = []
-        for timeentry in self.flat_hh2_records:
-            key = f"{timeentry['user_email'].lower()}{timeentry['date']}{timeentry['job_num']}"
-            try:
-                # print(key, self.rm_quickreference[key], timeentry['hours'])
-                if self.rm_quickreference_hrs[key] != timeentry['hours']:
-                    timeentry['action'] = 'update'
-                    timeentry['rm_entry_id'] = self.rm_quickreference_id[key]
-                    to_update += 1
-                else:
-                    timeentry['action'] = 'current'
-                    up_to_date += 1
-            except KeyError:
-                timeentry['action'] = 'add'
-                if timeentry['rm_proj_id'] == '':
-                    timeentry['messages'].extend([f"FAILED TO PROCESS: Job Number {timeentry['job_num']} is not in the system, so cannot post time to a time entry ({self.generate_now_string()})"])
-                    self.to_add_projntime +=1
-                    if timeentry['job_num'] not in self.undeployed_job_nums:
-                        self.undeployed_job_nums.append(timeentry['job_num'])
-                else:
-                    to_add += 1
-                continue
+        for timeentry, action, rm_entry_id, needs_project in zip(self.flat_hh2_records, reconciled['action'].tolist(), reconciled['rm_entry_id'].tolist(), reconciled['needs_project'].tolist()):
+            timeentry['action'] = action
+            if action == 'update':
+                timeentry['rm_entry_id'] = rm_entry_id
+            elif needs_project:
+                timeentry['messages'].extend([f"FAILED TO PROCESS: Job Number {timeentry['job_num']} is not in the system, so cannot post time to a time entry ({now_string})"])
+                if timeentry['job_num'] not in self.undeployed_job_nums:
+                    self.undeployed_job_nums.append(timeentry['job_num'])
         self.log.log(f"""Of the SS/HH2 Time Entries between {self.min_date} and {self.max_date}: 
     {up_to_date} entries current,
     {to_update} entries needing update
@@ -367,47 +576,98 @@ class SmartsheetRmAdmin():
     {self.to_add_projntime} entries that first need project added, then time added""")
         #region post data to rm
     def post_rm_time_changes(self):
-        'processes and posts time changes. It tracks job numbers not in RM, error messages, and generally posts action results and a summary of everything it did'
+        '''processes and posts time changes. It tracks job numbers not in RM, error messages, and generally posts action results and a summary of everything it did
+        entries are independent of each other so they are written w/ up to rm_write_workers at once (1 runs serially), each entry still does its delete before its add
+        w/ rm_async they are written by post_rm_time_changes_async'''
+        if self.rm_async:
+            return self.run_async(self.post_rm_time_changes_async)
         self.api_error_messages = []
-        self.api_error_messages_instance, successful_update, successful_add = 0, 0, 0
-        success = False
-        # actions
-        for i, entry in enumerate(self.flat_hh2_records):
-            action = entry.get('action')
-            if action== "add":
-                success= self.add_new_timedata(entry)
-            elif action== "update":
-                success= self.delete_old_timedata(entry) and self.add_new_timedata(entry)
-            elif action == "current":
-                entry['messages'].append(f"Job was current with {entry['hours']}, no action excuted ({self.generate_now_string()})")
-
+        self.api_error_messages_instance = 0
+        if self.rm_write_workers <= 1:
+            results = [self.execute_time_action(entry) for entry in self.flat_hh2_records]
+        else:
+            with ThreadPoolExecutor(max_workers=self.rm_write_workers) as executor:
+                results = list(executor.map(self.execute_time_action, self.flat_hh2_records))
+        self.log_rm_time_changes(results)
+    async def post_rm_time_changes_async(self, arm):
+        '''post_rm_time_changes w/ the calls on arm (an AsyncRmClient), every entry at once (arm's concurrency bounds the calls in flight)'''
+        self.api_error_messages = []
+        self.api_error_messages_instance = 0
+        results = await asyncio.gather(*[self.execute_time_action_async(arm, entry) for entry in self.flat_hh2_records])
+        self.log_rm_time_changes(results)
+    def log_rm_time_changes(self, results):
+        '''results are if each of flat_hh2_records posted successfully, notes it on the entries and logs the summary'''
+        successful_update, successful_add = 0, 0
         # loging actions
+        for entry, success in zip(self.flat_hh2_records, results):
+            action = entry.get('action')
             if success:
                 entry['messages'].append(f"Successful post of {entry['hours']} ({self.generate_now_string()})")
                 if action == 'add':
                     successful_add += 1
                 elif action == 'update':
                     successful_update += 1
+        self.perf.count('rm_time_entries_added', successful_add)
+        self.perf.count('rm_time_entries_updated', successful_update)
 
         # summary of action
         if self.to_add_projntime > 0:
-            self.log.log(f"There was {self.to_add_projntime} instances where a time entry post was attempted on a job we didn't have in the Resouce manager, these were for job(s): {self.undeployed_job_nums}")
+            self.log.log(f"There was {self.to_add_projntime} instances where a time entry post was attempted on a job we didn't have in the Resouce manager, these were for job(s): {self.undeployed_job_nums}", level='warning')
         if self.api_error_messages != []:
-            self.log.log(f"There was {self.api_error_messages_instance} instances where a time entry post failed due to api error, those errors were: {self.api_error_messages}")
+            self.log.log(f"There was {self.api_error_messages_instance} instances where a time entry post failed due to api error, those errors were: {self.api_error_messages}", level='error')
         if successful_update > 0 or successful_add > 0:
             self.log.log(f"~~Time Entry adjustedments are complete, there was {successful_add} successful time entries added and {successful_update} successful time entries updated~~")
+    def execute_time_action(self, entry):
+        '''runs the rm calls for one entry's action, returns if it posted successfully'''
+        action = entry.get('action')
+        if action== "add":
+            return self.add_new_timedata(entry)
+        elif action== "update":
+            return self.delete_old_timedata(entry) and self.add_new_timedata(entry)
+        elif action == "current":
+            entry['messages'].append(f"Job was current with {entry['hours']}, no action excuted ({self.generate_now_string()})")
+        return False
+    async def execute_time_action_async(self, arm, entry):
+        '''execute_time_action w/ the calls on arm, the delete(s) of an update still finish before its add'''
+        action = entry.get('action')
+        if action == "add":
+            return await self.add_new_timedata_async(arm, entry)
+        elif action == "update":
+            return await self.delete_old_timedata_async(arm, entry) and await self.add_new_timedata_async(arm, entry)
+        # nothing to send for the other actions
+        return self.execute_time_action(entry)
     def delete_old_timedata(self, timeentry):
         '''updates will add new and old hours, so we need to first delete old data before posting new'''
         result_list = []
         for id in timeentry['rm_entry_id']:
-            result_list.append(requests.delete(f"{self.base_url}/api/v1/users/{timeentry['rm_userid']}/time_entries/{id}", headers=self.rm_header).status_code)
+            result_list.append(self.rm.delete(f"/api/v1/users/{timeentry['rm_userid']}/time_entries/{id}").status_code)
+        return self.check_timedata_deletions(timeentry, result_list)
+    async def delete_old_timedata_async(self, arm, timeentry):
+        '''delete_old_timedata on arm, the entry's old rm entries are deleted at once'''
+        responses = await asyncio.gather(*[arm.delete(f"/api/v1/users/{timeentry['rm_userid']}/time_entries/{id}") for id in timeentry['rm_entry_id']])
+        return self.check_timedata_deletions(timeentry, [response.status_code for response in responses])
+    def check_timedata_deletions(self, timeentry, result_list):
+        '''result_list is the status codes of the deletes, notes a failure on the entry, returns if they all went through'''
         if not all(code == 200 for code in result_list):
             timeentry['messages'].extend([f"FAILED PREPOST DELETION: incorrect hours associated with this time/user/job number failed to delete ({self.generate_now_string()})"])
         return all(code == 200 for code in result_list)
     def add_new_timedata(self, timeentry):
         '''this posts the correct time data
         noting if an error was raised, or if there was no project id in RM to correspond with the job number'''
-        data = {
+        if timeentry['rm_proj_id']:
+            result = self.rm.post(f"/api/v1/users/{timeentry['rm_userid']}/time_entries", self.timedata_payload(timeentry))
+            return self.check_timedata_post(timeentry, result)
+        else:
+            # returns false because no proj_id which means could not post. The error was caught and documented in process_timedata_discrepencies()
+            return False
+    async def add_new_timedata_async(self, arm, timeentry):
+        '''add_new_timedata on arm'''
+        if timeentry['rm_proj_id']:
+            result = await arm.post(f"/api/v1/users/{timeentry['rm_userid']}/time_entries", self.timedata_payload(timeentry))
+            return self.check_timedata_post(timeentry, result)
+        return False
+    def timedata_payload(self, timeentry):
+        return {
             'user_id':timeentry['rm_userid'],
             'assignable_id':timeentry['rm_proj_id'],
             'date': timeentry['date'],
@@ -415,69 +675,72 @@ class SmartsheetRmAdmin():
             'task': timeentry['task'],
             'notes':timeentry['notes'][0:254]
         }
-        if timeentry['rm_proj_id']:
-            result = requests.post(
-                url = f"{self.base_url}/api/v1/users/{timeentry['rm_userid']}/time_entries",
-                headers=self.rm_header, 
-                data=json.dumps(data))
-            if result.json().get('errors'):
+    def check_timedata_post(self, timeentry, result):
+        '''notes any errors rm sent back on the entry (and in the run's error list), returns if the post went through'''
+        if result.json().get('errors'):
+            with self.rm_write_lock:
                 self.api_error_messages_instance += 1
                 for error in result.json().get('errors'):
                     timeentry['messages'].extend([f"FAILED TIME POST: {error} ({self.generate_now_string()})" for error in result.json().get('errors')])
                     if error not in self.api_error_messages:
                         self.api_error_messages.append(error)
-            return result.status_code == 200
-        else:
-            # returns false because no proj_id which means could not post. The error was caught and documented in process_timedata_discrepencies()
-            return False
+        return result.status_code == 200
         #endregion
     #endregion
     #region Project Syncing
     def grab_proj_sheetids(self):
-        '''grabs the sheet ids of projects from the workspace id'''
+        '''grabs the sheet ids of projects from the workspace id, and when each was last modified (used to skip unchanged sheets)'''
         self.sheet_ids = {}
-        for sheet in self.smart.Workspaces.get_workspace(self.proj_workspace_id).to_dict()['sheets']:
+        self.sheet_markers = {}
+        for sheet in grid.api_call(self.smart.Workspaces.get_workspace, self.proj_workspace_id).to_dict()['sheets']:
             self.sheet_ids[sheet['name']] = sheet['id']
+            self.sheet_markers[sheet['id']] = str(sheet['modifiedAt']) if sheet.get('modifiedAt') else None
     def establish_sheet_connection(self):
         '''checks sheet names against proj names in RM (also looking to see if the sheet name minus last character (which could be *) matches something in RM. 
-        if there is a match, its status is "connected", if not its status is "disconnected"'''
+        if there is a match, its status is "connected", if not its status is "disconnected"
+        uses rm_proj_name_index (from grab_rm_projids), when both names match it takes the project that comes first in rm_proj_list like a scan of the list would'''
         self.ss_proj_list = []
         for sheet_name in self.sheet_ids:
-            connected = False  # Flag to track connection status
-            for rm_proj in self.rm_proj_list:
-                rm_id=''
-                if rm_proj['project name'] == sheet_name or rm_proj['project name'] == sheet_name.rstrip('*'):
-                    connected = True
-                    rm_id = rm_proj['rm_proj_id']
-                    break  # Exit loop early if a match is found
+            matches = [match for match in (self.rm_proj_name_index.get(sheet_name), self.rm_proj_name_index.get(sheet_name.rstrip('*'))) if match is not None]
+            connected = bool(matches)  # Flag to track connection status
+            rm_id = min(matches)[1] if connected else ''
             status = 'connected' if connected else 'disconnected'
-            self.ss_proj_list.append({'name': sheet_name, 'ss_sheet_id': self.sheet_ids[sheet_name], 'rm_id':rm_id, 'status': status})
+            self.ss_proj_list.append({'name': sheet_name, 'ss_sheet_id': self.sheet_ids[sheet_name], 'rm_id':rm_id, 'status': status, 'sheet_marker': self.sheet_markers.get(self.sheet_ids[sheet_name])})
     def update_sheet_name(self, sheet_info):
-        '''adds star to end of all sheet names that need it'''
+        '''adds star to end of all sheet names that need it, returns True if the sheet was renamed'''
         if (sheet_info['status'] == "disconnected" and sheet_info['name'].endswith('*')) or (sheet_info['status'] == "connected" and not sheet_info['name'].endswith('*')):
-            return
+            return False
         elif sheet_info['status'] == "disconnected":
             new_name=sheet_info['name'] + "*"
         else:
             new_name= sheet_info['name'][:len(sheet_info['name'])-1]
         try:
-            updated_sheet = self.smart.Sheets.update_sheet(
+            updated_sheet = grid.api_call(self.smart.Sheets.update_sheet,
             # sheet id
             sheet_info['ss_sheet_id'], 
             # new name
             smartsheet.models.Sheet({
                 'name': new_name}))
+            return True
         except Exception as e:
-            self.log.log(f"Error updating sheet name: {e}")
+            self.log.log(f"Error updating sheet name: {e}", level='error')
+            return False
+    def get_sheet_marker(self, proj):
+        '''what the sheet looked like as of the workspace listing (its modifiedAt), or its version if the listing didn't have it'''
+        if proj.get('sheet_marker') is None:
+            proj['sheet_marker'] = f"v{grid.api_call(self.smart.Sheets.get_sheet_version, proj['ss_sheet_id']).version}"
+        return proj['sheet_marker']
+    def is_unchanged(self, proj, phase, rm_digest):
+        '''neither the sheet nor the rm side moved since the last time this phase found them in sync'''
+        return self.skip_unchanged_projects and self.sheet_state.unchanged(proj['ss_sheet_id'], phase, self.get_sheet_marker(proj), rm_digest)
     def grab_connected_sheet_data(self, sheet_i, sheet_info):
         '''if the sheet is connected, grab the nessisary data'''
         if sheet_info['status'] == "connected":
-            sheet_sum = grid(sheet_info['ss_sheet_id'])
-            sheet_sum.fetch_summary_content()
-            self.parent_data= sheet_sum.df.to_dict('records')
-            meta_data = {sum_field['title']: sum_field['displayValue'] for sum_field in self.parent_data if sum_field['title'] in ['Project Enumerator [MANUAL ENTRY]', 'DCT Status', 'Build Region', 'Build Job Number', 'Build Architect']}
+            # rows, columns and summary fields all come back in one get_sheet call
             sheet_grid = grid(sheet_info['ss_sheet_id'])
-            sheet_grid.fetch_content()
+            sheet_grid.fetch_content(include_summary=True)
+            parent_data= sheet_grid.summary_df.to_dict('records')
+            meta_data = {sum_field['title']: sum_field['displayValue'] for sum_field in parent_data if sum_field['title'] in ['Project Enumerator [MANUAL ENTRY]', 'DCT Status', 'Build Region', 'Build Job Number', 'Build Architect']}
             df = sheet_grid.df
             sheet_dict = df[df['Project'].notna()].to_dict('records')
             ss_assignment_data = {}
@@ -489,12 +752,28 @@ class SmartsheetRmAdmin():
             self.ss_proj_list[sheet_i]['meta_data'] = meta_data
             self.ss_proj_list[sheet_i]['ss_assignment_data'] = ss_assignment_data
     def get_rmproj_metadata(self, proj):
-        '''checks connected projects for sync of meta data (checking standard, and non standard Arch and Proj Enum fields seperatly), and compares. If out of sync, sounds to api call'''
+        '''checks connected projects for sync of meta data (checking standard, and non standard Arch and Proj Enum fields seperatly), and compares. If out of sync, sounds to api call
+        w/ rm_async the two calls go out together through get_rmproj_metadata_async'''
+        if self.rm_async:
+            return self.run_async(self.get_rmproj_metadata_async, proj)
         endpoint = f"/api/v1/projects/{proj['rm_id']}"
         standard_response = self.paginated_rm_getrequest(endpoint = endpoint)
         custom_response = self.paginated_rm_getrequest(endpoint = endpoint+"/custom_field_values")
-    
-
+        return self.build_rm_proj_metadata(proj, standard_response, custom_response)
+    async def get_rmproj_metadata_async(self, arm, proj):
+        '''get_rmproj_metadata on arm (an AsyncRmClient), the project and its custom fields are fetched at once'''
+        endpoint = f"/api/v1/projects/{proj['rm_id']}"
+        standard_response, custom_response = await asyncio.gather(
+            self.paginated_rm_getrequest_async(arm, endpoint),
+            self.paginated_rm_getrequest_async(arm, endpoint+"/custom_field_values"))
+        return self.build_rm_proj_metadata(proj, standard_response, custom_response)
+    async def prefetch_rmproj_metadata_async(self, arm, projs):
+        '''get_rmproj_metadata_async for every proj at once, each result is kept on its proj as 'rm_proj_metadata' for update_proj_metadata'''
+        results = await asyncio.gather(*[self.get_rmproj_metadata_async(arm, proj) for proj in projs])
+        for proj, rm_proj_metadata in zip(projs, results):
+            proj['rm_proj_metadata'] = rm_proj_metadata
+    def build_rm_proj_metadata(self, proj, standard_response, custom_response):
+        '''the project's metadata from its rm project and custom_field_values responses'''
         if standard_response and custom_response:
             status, status_id, arch, arch_id, enum, enum_id = '', '', '', '', '', ''
             for data_field in custom_response:
@@ -526,20 +805,25 @@ class SmartsheetRmAdmin():
             return rm_proj_metadata
 
         else:
-            self.log.log(f"{proj['name']} could not be found on RM")
+            self.log.log(f"{proj['name']} could not be found on RM", level='warning')
             return {'message':'error retrieving rm_proj_metadata for updating project meta data'}
         # region updating project meta data
     def execute_conditional_rm_proj_update(self, rm_proj_metadata, proj):
         '''checks for various types of project meta data that has been found to be out of sync.
-        standard data fields, tags, and custom data fields each have a different method to update'''
+        standard data fields, tags, and custom data fields each have a different method to update
+        returns True if anything was out of sync'''
+        updated = False
         if proj['meta_data'] == {}:
-            self.log.log('Smartsheet meta data is not in Summary names as expected, likely template was note used properly or adjusted')
+            self.log.log('Smartsheet meta data is not in Summary names as expected, likely template was note used properly or adjusted', level='warning')
         if not(rm_proj_metadata['job_num'] == proj['meta_data']['Build Job Number'] and rm_proj_metadata['region'] == proj['meta_data']['Build Region']):
             self. update_rm_proj_standfields(rm_proj_metadata, proj)
+            updated = True
         if not(rm_proj_metadata['custom_fields'][0]['value'] == proj['meta_data']['Build Architect'] 
                and rm_proj_metadata['custom_fields'][1]['value'] == proj['meta_data']['Project Enumerator [MANUAL ENTRY]'] 
                and rm_proj_metadata['custom_fields'][2]['value'] == proj['meta_data']['DCT Status']):
             self.update_rm_proj_customfields(rm_proj_metadata, proj)
+            updated = True
+        return updated
     def update_rm_proj_standfields(self, rm_proj_metadata, proj):
         '''updates project meta data that has been found to be out of sync.
         standard data fields, tags, and custom data fields each have a different method to update'''
@@ -549,19 +833,19 @@ class SmartsheetRmAdmin():
             'project_code':proj['meta_data']['Build Job Number'],
             'client':proj['meta_data']['Build Region'],
         }
-        response = requests.put(f"https://api.rm.smartsheet.com/api/v1/projects/{proj['rm_id']}", headers=self.rm_header, data=json.dumps(data))
+        response = self.rm.put(f"/api/v1/projects/{proj['rm_id']}", data)
 
         if response.status_code == 200:
             self.log.log(f"Updated {proj['name']}'s meta data")
+            self.invalidate_rm_directory('projects')
     def update_archived_projects(self):
-        '''archived project cannot have a job number // normal name b/c that may interfere with time & expense posting. To do this correctly, I need to first unarchive, then rearchive proj....'''
+        '''archived project cannot have a job number // normal name b/c that may interfere with time & expense posting. To do this correctly, I need to first unarchive, then rearchive proj....
+        the archived projects come w/ the project maps (grab_rm_projids), so a fresh rm cache saves the full listing download'''
         self.log.log('Updating Archived Projects as needed...')
-        response_dict = self.paginated_rm_getrequest(endpoint='/api/v1/projects?sort_field=created&sort_order=ascending&with_archived=true')
-        self.archived_proj = []
+        self.grab_rm_projids()
         
-        for proj in response_dict:
+        for proj in list(self.archived_proj):
             if proj['archived']:
-                self.archived_proj.append(proj)
                 if proj['name'].find('ARCHIVED') == -1:
                     self.log.log(f"""{proj['name']} starting update loop
                                  """)
@@ -578,14 +862,15 @@ class SmartsheetRmAdmin():
                         'id':proj['id'],
                         'archived':'true'
                     }
-                    response1 = requests.put(f"https://api.rm.smartsheet.com/api/v1/projects/{proj['id']}", headers=self.rm_header, data=json.dumps(data1))
-                    response2 = requests.put(f"https://api.rm.smartsheet.com/api/v1/projects/{proj['id']}", headers=self.rm_header, data=json.dumps(data2))
-                    response3 = requests.put(f"https://api.rm.smartsheet.com/api/v1/projects/{proj['id']}", headers=self.rm_header, data=json.dumps(data3))
+                    response1 = self.rm.put(f"/api/v1/projects/{proj['id']}", data1)
+                    response2 = self.rm.put(f"/api/v1/projects/{proj['id']}", data2)
+                    response3 = self.rm.put(f"/api/v1/projects/{proj['id']}", data3)
+                    self.invalidate_rm_directory('projects')
 
                     if response1.status_code and response2.status_code and response3.status_code == 200:
                         self.log.log(f"Correctly Archived {proj['name']}")
                     else:
-                        self.log.log(f"error with update- 1:{response1.json()} 2:{response2.json()} 3:{response3.json()}")
+                        self.log.log(f"error with update- 1:{response1.json()} 2:{response2.json()} 3:{response3.json()}", level='error')
         self.grab_rm_projids()
     def update_rm_proj_customfields(self, rm_proj_metadata,proj):
         '''updates project meta data that has been found to be out of sync.
@@ -599,24 +884,26 @@ class SmartsheetRmAdmin():
             elif custom_field['type'] == 'status':
                 value = proj['meta_data']['DCT Status']
             else:
-                self.log.log('failed to post custom field updates, system could not find the fields in its meta data')
+                self.log.log('failed to post custom field updates, system could not find the fields in its meta data', level='error')
 
-            self.response = requests.put(
-                f"https://api.rm.smartsheet.com/api/v1/projects/{proj['rm_id']}/custom_field_values/{custom_field['rm_id']}", 
-                headers=self.rm_header, 
-                data=json.dumps({'value':value}))
+            response = self.rm.put(
+                f"/api/v1/projects/{proj['rm_id']}/custom_field_values/{custom_field['rm_id']}", 
+                {'value':value})
             
-            if self.response.json().get('message') != "not found":
+            if response.json().get('message') != "not found":
                 self.log.log(f"{proj['name']} updated its custom fields")
             else:
-                self.log.log(f"{proj['name']} failed to update its custom fields")
+                self.log.log(f"{proj['name']} failed to update its custom fields", level='error')
         #endregion
     #endregion
     #region Assignments
     
-    def grab_rm_assignment_data(self, proj):
-        '''grabs rm assignment data to check if any updates are needed'''
-        rm_assignment_data_raw = self.paginated_rm_getrequest(f"/api/v1/projects/{proj['rm_id']}/assignments")
+    def grab_rm_assignment_data(self, proj, rm_assignment_data_raw=None):
+        '''grabs rm assignment data to check if any updates are needed (rm_assignment_data_raw skips the fetch if it was already done)'''
+        if rm_assignment_data_raw is None:
+            if self.rm_async:
+                return self.run_async(self.grab_rm_assignment_data_async, proj)
+            rm_assignment_data_raw = self.paginated_rm_getrequest(f"/api/v1/projects/{proj['rm_id']}/assignments")
         rm_assignment_data = []
         ss_assignment_to_new_status = []
         assignment_update_message = {}
@@ -639,15 +926,23 @@ class SmartsheetRmAdmin():
         proj['ss_assignment_to_new_status'] = ss_assignment_to_new_status
 
         return need_to_update
+    async def grab_rm_assignment_data_async(self, arm, proj):
+        '''grab_rm_assignment_data w/ the fetch on arm (an AsyncRmClient)'''
+        return self.grab_rm_assignment_data(proj, await self.paginated_rm_getrequest_async(arm, f"/api/v1/projects/{proj['rm_id']}/assignments"))
+    async def prefetch_rm_assignments_async(self, arm, projs):
+        '''every proj's raw rm assignments at once, kept on each proj as 'rm_assignment_data_raw' for update_proj_assignments'''
+        results = await asyncio.gather(*[self.paginated_rm_getrequest_async(arm, f"/api/v1/projects/{proj['rm_id']}/assignments") for proj in projs])
+        for proj, rm_assignment_data_raw in zip(projs, results):
+            proj['rm_assignment_data_raw'] = rm_assignment_data_raw
     def update_assignments_in_ss(self, update, proj):
         '''runs the updates, it just uses the grid class to do the update, but due to error handleing, I put in its own function'''
         if update:
             try:
-                proj['sheet_grid_obj'].update_rows(proj['ss_assignment_to_new_status'], 'Task Name - Backend Key')
+                proj['sheet_grid_obj'].update_rows(proj['ss_assignment_to_new_status'], 'Task Name - Backend Key', diff=True)
             except ValueError:
-                self.log.log(f'row update failed b/c row was missing from {proj["name"]} Smartsheet')
+                self.log.log(f'row update failed b/c row was missing from {proj["name"]} Smartsheet', level='warning')
             except ApiError:
-                self.log.log(f'updating the {proj["name"]} assignments failed')
+                self.log.log(f'updating the {proj["name"]} assignments failed', level='error')
     #endregion
     #region post to ss
     def post_ss_data(self, data):
@@ -660,10 +955,22 @@ class SmartsheetRmAdmin():
             if existing_message[:len(existing_message)-6] != new_message[:len(new_message)-6]:
                 self.posting_data.append({"Script Key":row['key'], 'Script Message':new_message})
         self.posting_data.insert(0, {"Script Key":"EmployeeNumberDateJobApprovalType", 'Script Message':""})
-        sheet = grid(self.hh2_data_sheetid)
-        sheet.update_rows(posting_data = self.posting_data, primary_key = "Script Key", update_type = "batch")
+        sheet = grid(self.hh2_data_sheetid, incremental=True)
+        sheet.update_rows(posting_data = self.posting_data, primary_key = "Script Key", update_type = "batch", diff = True)
     #endregion
 
+    def run_phases(self, names=None):
+        '''runs the phases below (all of them, or `names` plus the phases they need) through a PhaseScheduler, up to phase_workers at once, each timed in perf
+        the hours sync is split in two: fetch_hours_data (the hh2 sheet and the raw rm time entries) only needs the rm users, so it runs alongside the metadata pass,
+        the rest (run_hours_update's phase is apply_hours_update) maps job numbers <-> rm ids, and the metadata pass changes job numbers in rm, so it waits for that pass when it is in the run
+        the assignment pass reuses the metadata pass's sheet list and loaded sheets, so it waits for it'''
+        scheduler = PhaseScheduler(max_workers=self.phase_workers, wrap=self.perf.phase)
+        scheduler.add('grab_rm_data', self.grab_rm_data, gives=['rm_users', 'rm_projects'])
+        scheduler.add('run_proj_metadata_update', self.run_proj_metadata_update, needs=['rm_projects'], gives=['ss_proj_list'])
+        scheduler.add('fetch_hours_data', self.fetch_hours_data, needs=['rm_users'], gives=['hours_data'])
+        scheduler.add('run_hours_update', self.apply_hours_update, needs=['hours_data', 'rm_projects'], after=['run_proj_metadata_update'])
+        scheduler.add('run_assignment_updates', self.run_assignment_updates, needs=['ss_proj_list'])
+        return scheduler.run(names)
     def grab_rm_data(self):
         ''''''
         self.log.log("""Grabbing RM Data
@@ -674,12 +981,22 @@ class SmartsheetRmAdmin():
         self.grab_rm_projids()
     def run_hours_update(self):
         '''runs main script as intended'''
+        self.fetch_hours_data()
+        self.apply_hours_update()
+    def fetch_hours_data(self):
+        '''the part of the hours sync that doesn't use the project maps: the hh2 sheet (cleaned, not aggregated) and the rm users' time entries in its date window (not aggregated)'''
         self.log.log("""Time & Expense Updates:
                      """)
         self.grab_rm_userids()
-        self.fetch_and_prepare_hh2_data()
-        self.grab_rm_timedata()
+        self.hh2_df = self.load_hh2_data()
+        self.rm_users_timedata = self.fetch_rm_timedata(*self.hh2_date_window(self.hh2_df)) if self.hh2_df is not None else []
+    def apply_hours_update(self):
+        '''the rest of the hours sync, aggregates fetch_hours_data's rows w/ a copy of the project maps taken now, then reconciles and posts the changes
+        the copy keeps the job numbers the same all the way through, even if something reloads the maps meanwhile'''
         if self.error_w_hh2sheet == []:
+            jobnum_to_rm_id, rm_id_to_jobnum = dict(self.jobnum_to_rm_id), dict(self.rm_id_to_jobnum)
+            self.flat_hh2_records = self.aggregate_hh2_data(self.hh2_df, jobnum_to_rm_id)
+            self.build_rm_timedata(self.rm_users_timedata, rm_id_to_jobnum)
             self.process_timedata_discrepencies()
             self.post_rm_time_changes()
             self.post_ss_data(self.flat_hh2_records)
@@ -692,43 +1009,92 @@ class SmartsheetRmAdmin():
                      """)
         self.grab_proj_sheetids()
         self.establish_sheet_connection()
+        if self.rm_async:
+            # every connected project's rm side in one go, instead of two calls each as the projects come up
+            self.run_async(self.prefetch_rmproj_metadata_async, [proj for proj in self.ss_proj_list if proj['status'] == 'connected'])
         tot = len(self.ss_proj_list)
-        for proj_i, proj in enumerate(self.ss_proj_list):
-            self.log.log(f"{proj_i+1}/{tot}  Assessing {proj['name']}...")
-            self.update_sheet_name(proj)
-            if proj['status'] == 'connected':
-                try:
-                    time.sleep(4)
-                    self.grab_connected_sheet_data(proj_i, proj)
-                except KeyError:
-                    self.log.log(f"unknown error @{proj_i}, {proj}, skipping this project for now")
-                
-                rm_proj_metadata = self.get_rmproj_metadata(proj)
-                
+        if self.proj_workers <= 1:
+            for proj_i, proj in enumerate(self.ss_proj_list):
+                self.update_proj_metadata(proj_i, proj, tot)
+        else:
+            # projects don't depend on each other, the shared throttlers keep the workers inside the api rate limits
+            def grouped_update(proj_i, proj):
+                self.log.hold()
                 try:
-                    self.execute_conditional_rm_proj_update(rm_proj_metadata, proj)
-                except:
-                    self.log.log('issues locating the proj metadata resulted in failed update')
+                    self.update_proj_metadata(proj_i, proj, tot)
+                finally:
+                    self.log.release()
+            with ThreadPoolExecutor(max_workers=self.proj_workers) as executor:
+                # list() so an exception in a worker is raised here like it would be serially
+                list(executor.map(grouped_update, range(tot), self.ss_proj_list))
+        self.log_skipped_projects('metadata')
+        self.sheet_state.save()
         self.grab_rm_projids()
+    def update_proj_metadata(self, proj_i, proj, tot):
+        '''one project's pass: fix the star on its sheet name, then if it's connected, compare its sheet's summary w/ rm and push changes to rm
+        the sheet isn't loaded if neither it nor the rm metadata changed since they were last in sync
+        everything it touches is on its own proj dict, so it can run in parallel w/ other projects'''
+        self.log.log(f"{proj_i+1}/{tot}  Assessing {proj['name']}...")
+        renamed = self.update_sheet_name(proj)
+        if proj['status'] == 'connected':
+            rm_proj_metadata = proj.pop('rm_proj_metadata', None) or self.get_rmproj_metadata(proj)
+            rm_digest = self.sheet_state.digest(rm_proj_metadata)
+            if not renamed and self.is_unchanged(proj, 'metadata', rm_digest):
+                proj['skipped_metadata'] = True
+                self.log.log(f"{proj['name']} is unchanged since it was last in sync, skipping")
+                return
+
+            try:
+                self.grab_connected_sheet_data(proj_i, proj)
+            except KeyError:
+                self.log.log(f"unknown error @{proj_i}, {proj}, skipping this project for now", level='error')
+            
+            try:
+                updated = self.execute_conditional_rm_proj_update(rm_proj_metadata, proj)
+                # only an in sync state is remembered, our own rename/updates mean next run has to look again
+                if not renamed and not updated:
+                    self.sheet_state.record(proj['ss_sheet_id'], 'metadata', self.get_sheet_marker(proj), rm_digest)
+            except:
+                self.log.log('issues locating the proj metadata resulted in failed update', level='error')
+    def log_skipped_projects(self, phase):
+        connected = [proj for proj in self.ss_proj_list if proj['status'] == 'connected']
+        skipped = [proj for proj in connected if proj.get(f'skipped_{phase}')]
+        self.log.log(f"{len(skipped)} of {len(connected)} connected projects were unchanged and skipped ({phase})")
+        self.perf.count(f"projects_checked_{phase}", len(connected))
+        self.perf.count(f"projects_skipped_{phase}", len(skipped))
     def run_assignment_updates(self):
         '''assignments in rm are linked to users and projects and are line-item tasks in ss per project'''
         self.log.log("""Project Assignment Updates:
                      """)
-        try:    
-            for proj in self.ss_proj_list:
-                if proj['status'] == 'connected':
-                    update = self.grab_rm_assignment_data(proj)
-                    self.update_assignments_in_ss(update,proj)            
-        except AttributeError:
+        if not hasattr(self, 'ss_proj_list'):
             self.grab_proj_sheetids()
             self.establish_sheet_connection()
-            tot = len(self.ss_proj_list)
-            for proj_i, proj in enumerate(self.ss_proj_list):
+        if self.rm_async:
+            self.run_async(self.prefetch_rm_assignments_async, [proj for proj in self.ss_proj_list if proj['status'] == 'connected'])
+        tot = len(self.ss_proj_list)
+        for proj_i, proj in enumerate(self.ss_proj_list):
+            if proj['status'] == 'connected':
                 self.log.log(f"{proj_i+1}/{tot}  Assessing {proj['name']}...")
-                self.grab_connected_sheet_data(proj_i, proj)
-                if proj['status'] == 'connected':
-                    update = self.grab_rm_assignment_data(proj)
-                    self.update_assignments_in_ss(update,proj)
+                self.update_proj_assignments(proj_i, proj)
+        self.log_skipped_projects('assignments')
+        self.sheet_state.save()
+    def update_proj_assignments(self, proj_i, proj):
+        '''one project's assignment sync, the sheet is only loaded (if the metadata pass didn't already) when it or the rm assignments changed since they were last in sync
+        the rm assignments come from run_assignment_updates' prefetch when there was one'''
+        if 'rm_assignment_data_raw' in proj:
+            rm_assignment_data_raw = proj.pop('rm_assignment_data_raw')
+        else:
+            rm_assignment_data_raw = self.paginated_rm_getrequest(f"/api/v1/projects/{proj['rm_id']}/assignments")
+        rm_digest = self.sheet_state.digest(rm_assignment_data_raw)
+        if self.is_unchanged(proj, 'assignments', rm_digest):
+            proj['skipped_assignments'] = True
+            return
+        if 'ss_assignment_data' not in proj:
+            self.grab_connected_sheet_data(proj_i, proj)
+        update = self.grab_rm_assignment_data(proj, rm_assignment_data_raw)
+        self.update_assignments_in_ss(update,proj)
+        if not update:
+            self.sheet_state.record(proj['ss_sheet_id'], 'assignments', self.get_sheet_marker(proj), rm_digest)
 if __name__ == "__main__":
     # https://app.smartsheet.com/sheets/GffHvGGxVJwQ9P8w8gwgfqrmJjcq39JXvMQmH7q1?view=grid is hh2 data sheet
     # https://app.smartsheet.com/browse/workspaces/GXmwRM4wcCmjMVGVjhJ2cWCFR9QWMQCr5w8WGrx1 is proj workspace
@@ -740,13 +1106,27 @@ if __name__ == "__main__":
         'proj_workspace_id': 4883274435716996,
         'proj_list_sheetid': 3858046490306436,
         'rm_to_ss_status_ids':{550725:'Planned', 550729:'Active', 550726:'Potential', 550730:'Completed', 684245:'Check-in', 684246:'Not Completed', 698235:'Blocked'},
-        'rm_leave_type_ids':{"Vacation":8616592, "Sick":8616593, "Parental Leave":8616594}
+        'rm_leave_type_ids':{"Vacation":8616592, "Sick":8616593, "Parental Leave":8616594},
+        'rm_fetch_workers': 8,
+        'rm_write_workers': 8,
+        'proj_workers': 4,
+        'phase_workers': 2,
+        'rm_async': False,
+        'skip_unchanged_projects': True,
+        'rm_cache_ttl': 4 * 60 * 60,
+        # off: the hh2 sheet's 'Resulting Job Number' is derived (formulas), and a recalculated cell doesn't show up in rowsModifiedSince
+        'grid_snapshot_ttl': 0,
+        'rm_rate_limit': 10,
+        'ss_rate_limit': 5,
+        'log_level': 'info'
     }
     sra = SmartsheetRmAdmin(config)
-    sra.grab_rm_data()
-    sra.run_proj_metadata_update()
-    sra.run_hours_update()
-    sra.run_assignment_updates()
+    try:
+        # `python SS_RM_admin.py run_hours_update` runs just the named phase(s) and the ones they need
+        sra.run_phases(sys.argv[1:] or None)
+    finally:
+        # written even if a phase blew up, that run is the one worth looking at
+        sra.perf.write_report(sra.perf_report_path)
     sra.log.log("""~Fin
                      
                 """)
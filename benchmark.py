@@ -0,0 +1,337 @@
+'''offline micro-benchmarks, nothing in here touches the live apis
+run: python benchmark.py <name> [--rows N] [--columns N] [--repeat N]
+end_to_end runs the whole script against local fake apis: python benchmark.py end_to_end [--sizes 10,40,160] [--days N] [--latency MS] [--runs N] [--scheduled]'''
+import argparse
+import datetime
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+import types
+import pandas as pd
+import smartsheet
+from smartsheet.util import fresh_operation
+from smartsheet.workspaces import Workspaces
+try:
+    import globals
+except ImportError:
+    # SS_RM_admin star imports the api tokens from globals.py (kept out of the repo), nothing here calls the apis
+    sys.modules['globals'] = types.ModuleType('globals')
+from SS_RM_admin import SmartsheetRmAdmin
+from smartsheet_grid import grid, sheet_content_to_df
+from reconcile import aggregate_rm_timedata, reconcile_timedata
+from fake_apis import synthetic_apis
+
+def timed(fn, *args, repeat=1):
+    '''best wall time of `repeat` runs, and the last result'''
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn(*args)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+def report(name, baseline, candidate):
+    print(f"{name}: before {baseline:.3f}s  after {candidate:.3f}s  ({baseline / candidate:.1f}x)")
+
+#region sheet decode
+def synthetic_sheet_json(rows, columns, seed=0):
+    '''a get_sheet response shaped like the hh2 sheet: mostly text w/ display values, some numbers/blanks'''
+    rng = random.Random(seed)
+    sheet_columns = [{'id': 1000 + i, 'index': i, 'title': f"Column {i}", 'type': 'TEXT_NUMBER', 'primary': i == 0} for i in range(columns)]
+    sheet_rows = []
+    for row_i in range(rows):
+        cells = []
+        for column in sheet_columns:
+            kind = rng.random()
+            if kind < 0.6:
+                value = f"value {rng.randint(0, 10**6)}"
+                cells.append({'columnId': column['id'], 'value': value, 'displayValue': value})
+            elif kind < 0.9:
+                value = rng.randint(0, 40) / 4
+                cells.append({'columnId': column['id'], 'value': value, 'displayValue': str(value)})
+            else:
+                cells.append({'columnId': column['id']})
+        sheet_rows.append({'id': 5 * 10**15 + row_i, 'rowNumber': row_i + 1, 'cells': cells})
+    return json.dumps({'id': 1, 'name': 'synthetic', 'version': 1, 'columns': sheet_columns, 'rows': sheet_rows})
+def legacy_sheet_decode(payload):
+    '''the old fetch_content path: sdk models -> .to_dict() -> row by row lists -> DataFrame'''
+    grid_content = smartsheet.models.Sheet(json.loads(payload)).to_dict()
+    grid_columns = [i.get("title") for i in grid_content.get("columns")]
+    grid_rows = []
+    for i in grid_content.get("rows"):
+        c = []
+        for cell in i.get("cells"):
+            l = cell.get("displayValue")
+            m = cell.get("value")
+            c.append(m if l == None else l)
+        grid_rows.append(c)
+    df = pd.DataFrame(grid_rows, columns=grid_columns)
+    df["id"] = [i.get("id") for i in grid_content.get("rows")]
+    return df
+def columnar_sheet_decode(payload):
+    '''the current fetch_content path: raw json -> sheet_content_to_df'''
+    return sheet_content_to_df(json.loads(payload))
+def bench_sheet_decode(args):
+    payload = synthetic_sheet_json(args.rows, args.columns)
+    print(f"sheet decode, {args.rows} rows x {args.columns} columns ({len(payload) / 10**6:.1f} MB of json)")
+    before, legacy_df = timed(legacy_sheet_decode, payload, repeat=args.repeat)
+    after, columnar_df = timed(columnar_sheet_decode, payload, repeat=args.repeat)
+    assert legacy_df.astype(str).equals(columnar_df.astype(str)), "decoded frames differ"
+    report("grid.fetch_content decode", before, after)
+#endregion
+#region timedata reconciliation
+def synthetic_timedata(entries, seed=0):
+    '''rm time entries and hh2 records for the same users/jobs/dates, about half match (some w/ different hours), some jobs aren't rm projects'''
+    rng = random.Random(seed)
+    users = [(900 + i, f"User{i}@DowbuiltCT.com") for i in range(300)]
+    jobs = [(7000 + i, f"2{i:04d}") for i in range(400)]
+    dates = [str(datetime.date(2024, 1, 1) + datetime.timedelta(days=i)) for i in range(365)]
+    rm_timedata = []
+    hh2_records = []
+    for i in range(entries):
+        user_id, email = rng.choice(users)
+        assignable_id, job_num = rng.choice(jobs)
+        date = rng.choice(dates)
+        hours = rng.randint(1, 40) / 4
+        rm_timedata.append({'id': 10**6 + i, 'user_id': user_id, 'assignable_id': assignable_id if rng.random() > 0.02 else 1, 'date': date, 'hours': hours})
+        kind = rng.random()
+        if kind < 0.5:
+            user_id, email = rng.choice(users)
+            assignable_id, job_num = rng.choice(jobs)
+            date = rng.choice(dates)
+        elif kind < 0.6:
+            hours += 1
+        hh2_records.append({'user_email': email.lower() if rng.random() < 0.5 else email, 'date': date, 'job_num': job_num, 'hours': hours,
+                            'rm_proj_id': '' if assignable_id % 10 == 0 else assignable_id, 'messages': []})
+    rm_id_to_jobnum = {assignable_id: job_num for assignable_id, job_num in jobs}
+    userid_to_email = dict(users)
+    return rm_timedata, hh2_records, rm_id_to_jobnum, userid_to_email
+def legacy_reconcile(rm_timedata, hh2_records, rm_id_to_jobnum, userid_to_email):
+    '''the old grab_rm_timedata + process_timedata_discrepencies loops: f-string keys into two dicts, KeyError as the "add" branch'''
+    rm_quickreference_hrs, rm_quickreference_id = {}, {}
+    for timeentry in rm_timedata:
+        try:
+            timeentry['job_num'] = rm_id_to_jobnum[timeentry['assignable_id']]
+        except KeyError:
+            timeentry['job_num'] = "no_job_num"
+        timeentry['usr_email'] = userid_to_email[timeentry['user_id']]
+        key = f"{timeentry['usr_email'].lower()}{timeentry['date']}{timeentry['job_num']}"
+        if key not in rm_quickreference_hrs:
+            rm_quickreference_hrs[key] = timeentry['hours']
+            rm_quickreference_id[key] = [timeentry['id']]
+        else:
+            rm_quickreference_hrs[key] = rm_quickreference_hrs[key] + timeentry['hours']
+            rm_quickreference_id[key].append(timeentry['id'])
+    results = []
+    for timeentry in hh2_records:
+        key = f"{timeentry['user_email'].lower()}{timeentry['date']}{timeentry['job_num']}"
+        try:
+            if rm_quickreference_hrs[key] != timeentry['hours']:
+                results.append(('update', rm_quickreference_id[key]))
+            else:
+                results.append(('current', None))
+        except KeyError:
+            results.append(('add', timeentry['rm_proj_id'] == ''))
+    return results
+def frame_reconcile(rm_timedata, hh2_timedata, rm_id_to_jobnum, userid_to_email):
+    '''the current path: aggregate_rm_timedata + reconcile_timedata, in the same shape as legacy_reconcile's results
+    hh2_timedata is the frame aggregate_hh2_data keeps alongside the records'''
+    reconciled = reconcile_timedata(hh2_timedata, *aggregate_rm_timedata(rm_timedata, rm_id_to_jobnum, userid_to_email))
+    return [(action, rm_entry_id if action == 'update' else None if action == 'current' else needs_project)
+            for action, rm_entry_id, needs_project in zip(reconciled['action'].tolist(), reconciled['rm_entry_id'].tolist(), reconciled['needs_project'].tolist())]
+def bench_timedata_reconcile(args):
+    rm_timedata, hh2_records, rm_id_to_jobnum, userid_to_email = synthetic_timedata(args.rows)
+    hh2_timedata = pd.DataFrame(hh2_records, columns=['user_email', 'date', 'job_num', 'hours', 'rm_proj_id'])
+    print(f"timedata reconciliation, {args.rows} rm entries x {args.rows} hh2 records")
+    before, legacy_results = timed(legacy_reconcile, rm_timedata, hh2_records, rm_id_to_jobnum, userid_to_email, repeat=args.repeat)
+    after, frame_results = timed(frame_reconcile, rm_timedata, hh2_timedata, rm_id_to_jobnum, userid_to_email, repeat=args.repeat)
+    assert legacy_results == frame_results, "reconciled actions differ"
+    report("process_timedata_discrepencies", before, after)
+#endregion
+
+#region hh2 aggregation
+def synthetic_hh2_year(employees, seed=0):
+    '''a cleaned hh2 sheet (clean_df_for_processing's output) for a year of payroll: every employee, every weekday, 1-3 entries a day, some on the same job
+    returns (df, an admin w/ just the lookup maps aggregate_hh2_data reads)'''
+    rng = random.Random(seed)
+    jobs = [f"2{i:04d}" for i in range(400)]
+    days = [datetime.date(2024, 1, 1) + datetime.timedelta(days=i) for i in range(366)]
+    days = [day for day in days if day.weekday() < 5]
+    rows = []
+    for employee in range(employees):
+        employee_jobs = rng.sample(jobs, 5)
+        for day in days:
+            for _ in range(rng.randint(1, 3)):
+                rows.append({
+                    'Job': rng.choice(employee_jobs), 'Date': day, 'EmployeeNumber': str(1000 + employee),
+                    'Units': rng.randint(1, 16) / 2, 'Description': rng.choice(['framing', 'punch list', 'None', 'site walk']),
+                    'CostCodeName': rng.choice(['Labor', 'Supervision', None]), 'ApprovalType': rng.choice(['Sealed'] * 8 + [None, 'Pending']),
+                })
+    df = pd.DataFrame(rows)
+    df['Date'] = pd.to_datetime(df['Date'])
+    admin = SmartsheetRmAdmin.__new__(SmartsheetRmAdmin)
+    # a few employee numbers / jobs w/o an rm user / project, like the real data
+    admin.sageid_to_email = {str(1000 + i): f"user{i}@dowbuiltct.com" for i in range(employees) if i % 25}
+    admin.email_to_sageid = {email: sage_id for sage_id, email in admin.sageid_to_email.items()}
+    admin.email_to_userid = {email: 900 + i for i, email in enumerate(admin.email_to_sageid)}
+    admin.jobnum_to_rm_id = {job: 7000 + i for i, job in enumerate(jobs) if i % 10}
+    return df, admin
+def legacy_aggregate_hh2_data(self, df):
+    '''the old aggregate_hh2_data: lambda joins, row wise .apply lookups, convert_date_format per record'''
+    filtered_df = df[df['ApprovalType'].isin(['Sealed', None])]
+    filtered_df = filtered_df[['Job', 'Date', 'EmployeeNumber', 'Units', 'Description', 'CostCodeName']]
+    filtered_df['Description'] = filtered_df['Description'].fillna('')
+    filtered_df['CostCodeName'] = filtered_df['CostCodeName'].fillna('')
+    grouped = filtered_df.groupby(['Job', 'Date', 'EmployeeNumber']).agg({
+        'Units': 'sum',
+        'Description': lambda x: ' '.join(x),
+        'CostCodeName': lambda x: ' | '.join(x)
+    }).reset_index()
+    grouped['user'] = grouped['EmployeeNumber'].map(self.sageid_to_email).fillna('default_email@example.com')
+    grouped = grouped[grouped['user'] != 'default_email@example.com']
+    grouped['date'] = pd.to_datetime(grouped['Date']).dt.date.astype(str)
+    grouped['rm_user_id'] = grouped['user'].apply(
+        lambda x: str(int(self.email_to_userid.get(x.lower()))) if self.email_to_userid.get(x.lower()) is not None else None
+    )
+    grouped['rm_proj_id'] = grouped['Job'].apply(lambda x: self.jobnum_to_rm_id.get(x, ''))
+    return [{
+        "user_email": record['user'],
+        "rm_userid": record['rm_user_id'],
+        "job_num": record['Job'],
+        'rm_proj_id': record['rm_proj_id'],
+        "date": record['date'],
+        "hours": record['Units'],
+        "task": record['CostCodeName'],
+        "notes": record.get('Description'),
+        "key": f"{self.email_to_sageid.get(record['user'])}{self.convert_date_format(record['date'])}{record['Job']}Sealed",
+        "messages": []
+    } for record in grouped.to_dict('records')]
+def bench_hh2_aggregate(args):
+    df, admin = synthetic_hh2_year(args.employees)
+    print(f"hh2 aggregation, a year for {args.employees} employees ({len(df)} hh2 rows)")
+    before, legacy_records = timed(legacy_aggregate_hh2_data, admin, df, repeat=args.repeat)
+    after, records = timed(admin.aggregate_hh2_data, df, repeat=args.repeat)
+    assert legacy_records == records, "aggregated records differ"
+    report("aggregate_hh2_data", before, after)
+#endregion
+#region end to end
+PHASES = ['grab_rm_data', 'run_proj_metadata_update', 'run_hours_update', 'run_assignment_updates']
+def get_workspace(self, workspace_id, load_all=False, include=None):
+    '''GET /workspaces/<id> (the workspace w/ its sheets), what Workspaces.get_workspace did before the 3.x sdk dropped it'''
+    _op = fresh_operation("get_workspace")
+    _op["method"] = "GET"
+    _op["path"] = "/workspaces/" + str(workspace_id)
+    _op["query_params"]["loadAll"] = load_all
+    _op["query_params"]["include"] = include
+    return self._base.request(self._base.prepare_request(_op), "Workspace", _op)
+def ensure_get_workspace():
+    '''grab_proj_sheetids calls Workspaces.get_workspace, so on an sdk w/o it the harness puts it back (the fake api serves the old endpoint)'''
+    if not hasattr(Workspaces, 'get_workspace'):
+        Workspaces.get_workspace = get_workspace
+
+def run_phases(rm_api, ss_api, config):
+    '''one SmartsheetRmAdmin run (the phases in __main__'s order), returns [(phase, seconds, rm calls, ss calls, error)] and the admin
+    a phase that raises is reported and the run moves on, like a scheduled run's log would show it'''
+    sra = SmartsheetRmAdmin(config)
+    results = []
+    for phase in PHASES:
+        rm_before, ss_before = rm_api.call_count(), ss_api.call_count()
+        start = time.perf_counter()
+        error = None
+        try:
+            with sra.perf.phase(phase):
+                getattr(sra, phase)()
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+        results.append((phase, time.perf_counter() - start, rm_api.call_count() - rm_before, ss_api.call_count() - ss_before, error))
+    sra.rm.close()
+    return results, sra
+def run_scheduled(rm_api, ss_api, config):
+    '''one run through SmartsheetRmAdmin.run_phases (phases overlapping where they can), returns (wall seconds, rm calls, ss calls, error, admin)'''
+    sra = SmartsheetRmAdmin(config)
+    rm_before, ss_before = rm_api.call_count(), ss_api.call_count()
+    start = time.perf_counter()
+    error = None
+    try:
+        sra.run_phases()
+    except Exception as e:
+        error = f"{type(e).__name__}: {e}"
+    sra.rm.close()
+    return time.perf_counter() - start, rm_api.call_count() - rm_before, ss_api.call_count() - ss_before, error, sra
+def bench_end_to_end(args):
+    ensure_get_workspace()
+    for projects in args.sizes:
+        rm_api, ss_api, fake_config = synthetic_apis(projects, days=args.days, latency=args.latency / 1000)
+        rm_api.start()
+        ss_api.start()
+        hh2_rows = len(ss_api.sheets[fake_config['hh2_data_sheetid']]['rows']) - 1
+        rm_entries = sum(len(entries) for entries in rm_api.time_entries.values())
+        print(f"\nend to end, {projects} projects, {len(rm_api.users)} users, {hh2_rows} hh2 rows, {rm_entries} rm time entries ({args.latency}ms per call)")
+        # the column cache is keyed by sheet id/version, every size reuses the same ids
+        grid.column_cache.clear()
+        try:
+            with tempfile.TemporaryDirectory() as state_dir:
+                config = dict(
+                    fake_config,
+                    smartsheet_token='offline', rm_token='offline',
+                    base_url=rm_api.url, ss_api_base=ss_api.url,
+                    rm_rate_limit=args.rm_rate, ss_rate_limit=args.ss_rate,
+                    rm_cache_ttl=0, grid_snapshot_ttl=0,
+                    sheet_state_path=os.path.join(state_dir, 'sheet_state.json'),
+                    perf_report_path=os.path.join(state_dir, 'perf_report.json'),
+                    log_level='warning',
+                    rm_async=args.rm_async,
+                )
+                for run in range(args.runs):
+                    if args.scheduled:
+                        # phases overlap, so calls can't be split by phase, only the phases' own times are shown
+                        seconds, rm_calls, ss_calls, error, sra = run_scheduled(rm_api, ss_api, config)
+                        print(f"run {run + 1}:" if args.runs > 1 else "", f"{'phase (scheduled)':<26}{'seconds':>9}{'rm calls':>10}{'ss calls':>10}")
+                        for phase in sra.perf.report()['phases']:
+                            print(f"  {phase['name']:<26}{phase['seconds']:>9.2f}" + ("  FAILED" if phase['error'] else ""))
+                        print(f"  {'wall':<26}{seconds:>9.2f}{rm_calls:>10}{ss_calls:>10}" + (f"  FAILED {error}" if error else ""))
+                    else:
+                        results, sra = run_phases(rm_api, ss_api, config)
+                        print(f"run {run + 1}:" if args.runs > 1 else "", f"{'phase':<26}{'seconds':>9}{'rm calls':>10}{'ss calls':>10}")
+                        for phase, seconds, rm_calls, ss_calls, error in results:
+                            print(f"  {phase:<26}{seconds:>9.2f}{rm_calls:>10}{ss_calls:>10}" + (f"  FAILED {error}" if error else ""))
+                        print(f"  {'total':<26}{sum(result[1] for result in results):>9.2f}{sum(result[2] for result in results):>10}{sum(result[3] for result in results):>10}")
+                    if args.verbose:
+                        for call in sra.perf.report()['calls'][:10]:
+                            print(f"    {call['category']:<12}{call['name']:<50}{call['calls']:>6} calls {call['seconds']:>8.2f}s")
+        finally:
+            rm_api.stop()
+            ss_api.stop()
+#endregion
+
+BENCHMARKS = {
+    'sheet_decode': bench_sheet_decode,
+    'timedata_reconcile': bench_timedata_reconcile,
+    'hh2_aggregate': bench_hh2_aggregate,
+    'end_to_end': bench_end_to_end,
+}
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('name', choices=list(BENCHMARKS) + ['all'])
+    parser.add_argument('--rows', type=int, default=20000)
+    parser.add_argument('--columns', type=int, default=20)
+    parser.add_argument('--employees', type=int, default=250)
+    parser.add_argument('--repeat', type=int, default=1)
+    parser.add_argument('--sizes', type=lambda sizes: [int(size) for size in sizes.split(',')], default=[10, 40, 160], help="end_to_end: project counts to run at")
+    parser.add_argument('--days', type=int, default=20, help="end_to_end: weekdays of hh2 time")
+    parser.add_argument('--latency', type=float, default=20, help="end_to_end: ms the fake apis take per call")
+    # well above what the servers can take, so the numbers are the script's own, use 10 / 5 to see production pacing
+    parser.add_argument('--rm-rate', type=float, default=1000)
+    parser.add_argument('--ss-rate', type=float, default=1000)
+    parser.add_argument('--scheduled', action='store_true', help="end_to_end: run through SmartsheetRmAdmin.run_phases instead of one phase after the other")
+    parser.add_argument('--rm-async', action='store_true', help="end_to_end: run w/ rm_async (needs aiohttp)")
+    parser.add_argument('--runs', type=int, default=1, help="end_to_end: runs per size against the same servers (later runs see the first one's writes)")
+    parser.add_argument('--verbose', action='store_true')
+    args = parser.parse_args()
+    for name, bench in BENCHMARKS.items():
+        if args.name in (name, 'all'):
+            bench(args)
@@ -0,0 +1,58 @@
+import gzip
+import os
+import pickle
+import time
+
+class DiskCache:
+    """
+    A small on-disk cache w/ a time to live, used to keep RM lookup maps between scheduled runs.
+
+    Each entry is stored in its own gzipped pickle file (<directory>/<name>.pkl.gz) along with the time it was saved,
+    pickle keeps the int keys of maps like rm_id_to_jobnum intact (json would turn them into strings).
+
+    Attributes:
+    -----------
+    directory : str
+        where the cache files live, created on first save.
+    ttl : float
+        seconds an entry stays fresh, 0 (or less) turns the cache off.
+
+    Methods:
+    --------
+    load(name) -> Any or None:
+        the saved data, or None if there is nothing saved, it is older than ttl, or it can't be read.
+    save(name, data) -> None
+    invalidate(name) -> None:
+        drops an entry so the next load misses (used when we change the underlying data ourselves).
+    """
+
+    def __init__(self, directory, ttl):
+        self.directory = directory
+        self.ttl = ttl
+    def path(self, name):
+        return os.path.join(self.directory, f"{name}.pkl.gz")
+    def load(self, name):
+        if self.ttl <= 0:
+            return None
+        try:
+            with gzip.open(self.path(name), 'rb') as file:
+                saved_at, data = pickle.load(file)
+        except (OSError, EOFError, pickle.UnpicklingError, ValueError):
+            return None
+        if time.time() - saved_at > self.ttl:
+            return None
+        return data
+    def save(self, name, data):
+        if self.ttl <= 0:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        # write then rename so a crash mid write never leaves a half written entry behind
+        tmp_path = self.path(name) + ".tmp"
+        with gzip.open(tmp_path, 'wb') as file:
+            pickle.dump((time.time(), data), file, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, self.path(name))
+    def invalidate(self, name):
+        try:
+            os.remove(self.path(name))
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,516 @@
+'''local stand-ins for the RM and Smartsheet apis, for benchmark.py's end to end runs (nothing in here touches the live apis)
+only the endpoints SmartsheetRmAdmin and grid call are served, w/ just enough of each api's behavior (paging, date filters, row/summary writes, sheet versions) for a full run to go through
+writes are applied, so a second run against the same servers sees what the first one left behind'''
+import datetime
+import itertools
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qsl, urlencode
+from perf import endpoint_name
+
+class FakeApi:
+    """
+    A threaded local http server that answers json requests from a route table, the base of FakeRmApi and FakeSmartsheetApi.
+
+    Attributes:
+    -----------
+    latency : float
+        seconds every request sleeps before it is answered (outside the lock, so calls in flight together overlap like they would over a network).
+    calls : dict
+        {"<METHOD> <endpoint>": count}, w/ the ids in the path replaced by {id} (see perf.endpoint_name).
+    url : str
+        root url to point the client at, set by start().
+
+    Methods:
+    --------
+    start() -> self:
+        serves on a free localhost port from a background thread.
+    stop() -> None
+    call_count() -> int:
+        total requests answered so far.
+    handle(method, path, query, body) -> (status, dict):
+        runs the first route that matches, routes are (method, path regex, method name) and the handler gets the regex groups (as ints), query and body.
+    """
+    # path prefix the client puts in front of every endpoint (ie smartsheet's /2.0)
+    prefix = ''
+    routes = []
+
+    def __init__(self, latency=0.0):
+        self.latency = latency
+        self.calls = {}
+        self.lock = threading.Lock()
+        self.server = None
+        self.url = None
+    def start(self):
+        api = self
+        class Handler(BaseHTTPRequestHandler):
+            # keep-alive, so the clients' connection pools behave like they do against the real apis
+            protocol_version = "HTTP/1.1"
+            def respond(self):
+                length = int(self.headers.get('Content-Length') or 0)
+                raw_body = self.rfile.read(length) if length else b''
+                parsed = urlparse(self.path)
+                status, payload = api.handle(self.command, parsed.path, dict(parse_qsl(parsed.query)), json.loads(raw_body) if raw_body else None)
+                content = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(content)))
+                self.end_headers()
+                self.wfile.write(content)
+            do_GET = do_POST = do_PUT = do_DELETE = respond
+            def log_message(self, *args):
+                pass
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.server.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self.server.server_port}{self.prefix}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+    def stop(self):
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
+    def call_count(self):
+        with self.lock:
+            return sum(self.calls.values())
+    def handle(self, method, path, query, body):
+        if self.latency:
+            time.sleep(self.latency)
+        path = path[len(self.prefix):] if path.startswith(self.prefix) else path
+        with self.lock:
+            name = f"{method} {endpoint_name(path)}"
+            self.calls[name] = self.calls.get(name, 0) + 1
+            for route_method, pattern, handler in self.routes:
+                match = re.fullmatch(pattern, path)
+                if route_method == method and match:
+                    return getattr(self, handler)(*[int(group) for group in match.groups()], query=query, body=body)
+        return 404, {'message': 'not found'}
+
+class FakeRmApi(FakeApi):
+    """
+    The RM endpoints SmartsheetRmAdmin uses: users, projects (w/ custom_field_values and assignments) and each user's time_entries.
+    Listings are paged like rm ({'data': [...], 'paging': {'next': ...}}, per_page defaults to 20), time entries can be filtered w/ from/to.
+
+    Attributes:
+    -----------
+    users : list
+    projects : dict
+        {project id: project}
+    custom_field_values / assignments : dict
+        {project id: list}
+    time_entries : dict
+        {user id: list}
+    leave_type_ids : set
+        ids (besides the projects) a time entry can be posted to.
+    """
+    routes = [
+        ('GET', r'/api/v1/users', 'list_users'),
+        ('PUT', r'/api/v1/users/(\d+)', 'update_user'),
+        ('GET', r'/api/v1/projects', 'list_projects'),
+        ('GET', r'/api/v1/projects/(\d+)', 'get_project'),
+        ('PUT', r'/api/v1/projects/(\d+)', 'update_project'),
+        ('GET', r'/api/v1/projects/(\d+)/custom_field_values', 'list_custom_field_values'),
+        ('PUT', r'/api/v1/projects/(\d+)/custom_field_values/(\d+)', 'update_custom_field_value'),
+        ('GET', r'/api/v1/projects/(\d+)/assignments', 'list_assignments'),
+        ('GET', r'/api/v1/users/(\d+)/time_entries', 'list_time_entries'),
+        ('POST', r'/api/v1/users/(\d+)/time_entries', 'add_time_entry'),
+        ('DELETE', r'/api/v1/users/(\d+)/time_entries/(\d+)', 'delete_time_entry'),
+    ]
+
+    def __init__(self, users, projects, custom_field_values, assignments, time_entries, leave_type_ids, latency=0.0):
+        super().__init__(latency)
+        self.users = users
+        self.projects = projects
+        self.custom_field_values = custom_field_values
+        self.assignments = assignments
+        self.time_entries = time_entries
+        self.leave_type_ids = set(leave_type_ids)
+        self.next_id = itertools.count(10**8)
+    def page(self, path, query, items):
+        page, per_page = int(query.get('page', 1)), int(query.get('per_page', 20))
+        start = (page - 1) * per_page
+        next_page = f"{path}?{urlencode(dict(query, page=page + 1))}" if start + per_page < len(items) else None
+        return 200, {'data': items[start:start + per_page], 'paging': {'page': page, 'per_page': per_page, 'next': next_page}}
+    def list_users(self, query, body):
+        return self.page('/api/v1/users', query, self.users)
+    def update_user(self, user_id, query, body):
+        user = next((user for user in self.users if user['id'] == user_id), None)
+        if user is None:
+            return 404, {'message': 'not found'}
+        user.update({key: value for key, value in body.items() if key != 'id'})
+        return 200, user
+    def list_projects(self, query, body):
+        return self.page('/api/v1/projects', query, list(self.projects.values()))
+    def get_project(self, project_id, query, body):
+        if project_id not in self.projects:
+            return 404, {'message': 'not found'}
+        return 200, self.projects[project_id]
+    def update_project(self, project_id, query, body):
+        if project_id not in self.projects:
+            return 404, {'message': 'not found'}
+        for key, value in body.items():
+            if key == 'archived':
+                value = value in (True, 'true')
+            if key != 'id':
+                self.projects[project_id][key] = value
+        return 200, self.projects[project_id]
+    def list_custom_field_values(self, project_id, query, body):
+        return self.page(f'/api/v1/projects/{project_id}/custom_field_values', query, self.custom_field_values.get(project_id, []))
+    def update_custom_field_value(self, project_id, field_id, query, body):
+        field = next((field for field in self.custom_field_values.get(project_id, []) if field['id'] == field_id), None)
+        if field is None:
+            return 404, {'message': 'not found'}
+        field['value'] = body.get('value')
+        return 200, field
+    def list_assignments(self, project_id, query, body):
+        return self.page(f'/api/v1/projects/{project_id}/assignments', query, self.assignments.get(project_id, []))
+    def list_time_entries(self, user_id, query, body):
+        entries = [entry for entry in self.time_entries.get(user_id, [])
+                   if query.get('from', entry['date']) <= entry['date'] <= query.get('to', entry['date'])]
+        return self.page(f'/api/v1/users/{user_id}/time_entries', query, entries)
+    def add_time_entry(self, user_id, query, body):
+        assignable_id = int(body.get('assignable_id') or 0)
+        if assignable_id not in self.projects and assignable_id not in self.leave_type_ids:
+            return 422, {'errors': [f"assignable {body.get('assignable_id')} not found"]}
+        entry = {'id': next(self.next_id), 'user_id': user_id, 'assignable_id': assignable_id, 'date': body['date'],
+                 'hours': body['hours'], 'task': body.get('task'), 'notes': body.get('notes')}
+        self.time_entries.setdefault(user_id, []).append(entry)
+        return 200, entry
+    def delete_time_entry(self, user_id, entry_id, query, body):
+        entries = self.time_entries.get(user_id, [])
+        kept = [entry for entry in entries if entry['id'] != entry_id]
+        if len(kept) == len(entries):
+            return 404, {'message': 'not found'}
+        self.time_entries[user_id] = kept
+        return 200, {}
+
+def utc_stamp(moment):
+    return moment.strftime('%Y-%m-%dT%H:%M:%SZ')
+
+class FakeSmartsheetApi(FakeApi):
+    """
+    The Smartsheet endpoints grid and SmartsheetRmAdmin use: one workspace's sheet listing, and per sheet its rows, columns, version,
+    name and summary fields. get_sheet honors columnIds, include=summary and rowsModifiedSince, every write bumps the sheet's version/modifiedAt.
+
+    Attributes:
+    -----------
+    sheets : dict
+        {sheet id: {'id', 'name', 'version', 'modifiedAt', 'columns', 'rows', 'summary'}}
+        a row is {'id', 'modifiedAt', 'cells': {column id: value}}, displayValues are worked out when the sheet is served.
+    workspaces : dict
+        {workspace id: [sheet ids]}
+    """
+    prefix = '/2.0'
+    routes = [
+        ('GET', r'/workspaces/(\d+)', 'get_workspace'),
+        ('GET', r'/sheets/(\d+)', 'get_sheet'),
+        ('PUT', r'/sheets/(\d+)', 'update_sheet'),
+        ('GET', r'/sheets/(\d+)/version', 'get_sheet_version'),
+        ('GET', r'/sheets/(\d+)/columns', 'get_columns'),
+        ('POST', r'/sheets/(\d+)/rows', 'add_rows'),
+        ('PUT', r'/sheets/(\d+)/rows', 'update_rows'),
+        ('DELETE', r'/sheets/(\d+)/rows', 'delete_rows'),
+        ('GET', r'/sheets/(\d+)/summary/fields', 'get_summary_fields'),
+        ('POST', r'/sheets/(\d+)/summary/fields', 'add_summary_fields'),
+        ('PUT', r'/sheets/(\d+)/summary/fields', 'update_summary_fields'),
+    ]
+
+    def __init__(self, sheets, workspaces, latency=0.0):
+        super().__init__(latency)
+        self.sheets = sheets
+        self.workspaces = workspaces
+        self.next_id = itertools.count(9 * 10**15)
+    def error(self, status, error_code, message):
+        return status, {'errorCode': error_code, 'message': message, 'refId': 'fake'}
+    def touch(self, sheet, rows=()):
+        now = datetime.datetime.now(datetime.timezone.utc)
+        sheet['version'] += 1
+        sheet['modifiedAt'] = now
+        for row in rows:
+            row['modifiedAt'] = now
+    def display_value(self, column, value):
+        if value is None:
+            return None
+        if column['type'] == 'DATE' and re.fullmatch(r'\d{4}-\d{2}-\d{2}', str(value)):
+            year, month, day = str(value).split('-')
+            return f"{month}/{day}/{year[2:]}"
+        if isinstance(value, float) and value.is_integer():
+            return str(int(value))
+        return str(value)
+    def serialize_row(self, row, columns, row_number):
+        cells = []
+        for column in columns:
+            value = row['cells'].get(column['id'])
+            cell = {'columnId': column['id']}
+            if value is not None:
+                cell.update(value=value, displayValue=self.display_value(column, value))
+            cells.append(cell)
+        return {'id': row['id'], 'rowNumber': row_number, 'modifiedAt': utc_stamp(row['modifiedAt']), 'cells': cells}
+    def sheet_meta(self, sheet):
+        return {'id': sheet['id'], 'name': sheet['name'], 'version': sheet['version'], 'modifiedAt': utc_stamp(sheet['modifiedAt']),
+                'permalink': f"https://app.smartsheet.com/sheets/{sheet['id']}"}
+    def write_cells(self, sheet, row, cells):
+        column_ids = {column['id'] for column in sheet['columns']}
+        for cell in cells:
+            if cell.get('columnId') not in column_ids:
+                return False
+            row['cells'][cell['columnId']] = None if cell.get('value') == '' else cell.get('value')
+        return True
+    def get_workspace(self, workspace_id, query, body):
+        if workspace_id not in self.workspaces:
+            return self.error(404, 1006, 'Not Found')
+        return 200, {'id': workspace_id, 'name': f"workspace {workspace_id}", 'sheets': [self.sheet_meta(self.sheets[sheet_id]) for sheet_id in self.workspaces[workspace_id]]}
+    def get_sheet(self, sheet_id, query, body):
+        sheet = self.sheets.get(sheet_id)
+        if sheet is None:
+            return self.error(404, 1006, 'Not Found')
+        columns = sheet['columns']
+        if query.get('columnIds'):
+            wanted = {int(column_id) for column_id in query['columnIds'].split(',')}
+            columns = [column for column in columns if column['id'] in wanted]
+        since = query.get('rowsModifiedSince')
+        since = datetime.datetime.fromisoformat(since.replace('Z', '+00:00')).replace(microsecond=0) if since else None
+        rows = [self.serialize_row(row, columns, row_number) for row_number, row in enumerate(sheet['rows'], 1)
+                if since is None or row['modifiedAt'].replace(microsecond=0) >= since]
+        content = dict(self.sheet_meta(sheet), columns=columns, rows=rows, totalRowCount=len(sheet['rows']))
+        if 'summary' in (query.get('include') or '').split(','):
+            content['summary'] = {'fields': sheet['summary']}
+        return 200, content
+    def update_sheet(self, sheet_id, query, body):
+        sheet = self.sheets.get(sheet_id)
+        if sheet is None:
+            return self.error(404, 1006, 'Not Found')
+        if body.get('name'):
+            sheet['name'] = body['name']
+        self.touch(sheet)
+        return 200, {'message': 'SUCCESS', 'resultCode': 0, 'result': self.sheet_meta(sheet)}
+    def get_sheet_version(self, sheet_id, query, body):
+        if sheet_id not in self.sheets:
+            return self.error(404, 1006, 'Not Found')
+        return 200, {'version': self.sheets[sheet_id]['version']}
+    def get_columns(self, sheet_id, query, body):
+        if sheet_id not in self.sheets:
+            return self.error(404, 1006, 'Not Found')
+        columns = self.sheets[sheet_id]['columns']
+        return 200, {'pageNumber': 1, 'pageSize': len(columns), 'totalPages': 1, 'totalCount': len(columns), 'data': columns}
+    def add_rows(self, sheet_id, query, body):
+        sheet = self.sheets.get(sheet_id)
+        if sheet is None:
+            return self.error(404, 1006, 'Not Found')
+        body = body if isinstance(body, list) else [body]
+        added = []
+        for new_row in body:
+            row = {'id': next(self.next_id), 'cells': {}}
+            if not self.write_cells(sheet, row, new_row.get('cells') or []):
+                return self.error(400, 1036, 'Invalid column id')
+            added.append((new_row.get('toTop', False), row))
+        top = [row for to_top, row in added if to_top]
+        sheet['rows'] = top + sheet['rows'] + [row for to_top, row in added if not to_top]
+        self.touch(sheet, [row for _, row in added])
+        return 200, {'message': 'SUCCESS', 'resultCode': 0, 'version': sheet['version'],
+                     'result': [self.serialize_row(row, sheet['columns'], None) for _, row in added]}
+    def update_rows(self, sheet_id, query, body):
+        sheet = self.sheets.get(sheet_id)
+        if sheet is None:
+            return self.error(404, 1006, 'Not Found')
+        rows_by_id = {row['id']: row for row in sheet['rows']}
+        updated = []
+        for changes in body if isinstance(body, list) else [body]:
+            row = rows_by_id.get(changes.get('id'))
+            if row is None:
+                return self.error(404, 1006, 'Not Found')
+            if not self.write_cells(sheet, row, changes.get('cells') or []):
+                return self.error(400, 1036, 'Invalid column id')
+            updated.append(row)
+        self.touch(sheet, updated)
+        return 200, {'message': 'SUCCESS', 'resultCode': 0, 'version': sheet['version'],
+                     'result': [self.serialize_row(row, sheet['columns'], None) for row in updated]}
+    def delete_rows(self, sheet_id, query, body):
+        sheet = self.sheets.get(sheet_id)
+        if sheet is None:
+            return self.error(404, 1006, 'Not Found')
+        ids = [int(row_id) for row_id in (query.get('ids') or '').split(',') if row_id]
+        known = {row['id'] for row in sheet['rows']}
+        if query.get('ignoreRowsNotFound') != 'true' and not set(ids) <= known:
+            return self.error(404, 1006, 'Not Found')
+        deleted = set(ids) & known
+        sheet['rows'] = [row for row in sheet['rows'] if row['id'] not in deleted]
+        self.touch(sheet)
+        return 200, {'message': 'SUCCESS', 'resultCode': 0, 'version': sheet['version'], 'result': sorted(deleted)}
+    def get_summary_fields(self, sheet_id, query, body):
+        if sheet_id not in self.sheets:
+            return self.error(404, 1006, 'Not Found')
+        fields = self.sheets[sheet_id]['summary']
+        return 200, {'pageNumber': 1, 'pageSize': len(fields), 'totalPages': 1, 'totalCount': len(fields), 'data': fields}
+    def add_summary_fields(self, sheet_id, query, body):
+        sheet = self.sheets.get(sheet_id)
+        if sheet is None:
+            return self.error(404, 1006, 'Not Found')
+        added = [dict(field, id=next(self.next_id), index=len(sheet['summary']) + i) for i, field in enumerate(body)]
+        sheet['summary'].extend(added)
+        self.touch(sheet)
+        return 200, {'message': 'SUCCESS', 'resultCode': 0, 'result': added}
+    def update_summary_fields(self, sheet_id, query, body):
+        sheet = self.sheets.get(sheet_id)
+        if sheet is None:
+            return self.error(404, 1006, 'Not Found')
+        fields_by_id = {field['id']: field for field in sheet['summary']}
+        updated = []
+        for changes in body:
+            field = fields_by_id.get(changes.get('id'))
+            if field is None:
+                return self.error(404, 1006, 'Not Found')
+            value = changes.get('objectValue', changes.get('ObjectValue'))
+            field.update(objectValue=value, displayValue=None if value is None else str(value))
+            updated.append(field)
+        self.touch(sheet)
+        return 200, {'message': 'SUCCESS', 'resultCode': 0, 'result': updated}
+
+#region synthetic data
+HH2_COLUMNS = ['EmployeeNumber', 'EmployeeName', 'Date', 'PayrollGroup', 'PayrollServiceId', 'Job', 'JobName', 'CostCode', 'CostCodeName',
+               'CertifiedClass', 'CertifiedClassName', 'PayType', 'PayTypeName', 'Units', 'Description', 'ApprovalType',
+               'Resulting Job Number', 'Script Key', 'Script Message']
+PROJECT_COLUMNS = ['Task Name', 'Project', 'Task Name - Backend Key', 'Task Status']
+STATUS_IDS = {550725: 'Planned', 550729: 'Active', 550726: 'Potential', 550730: 'Completed', 684245: 'Check-in', 684246: 'Not Completed', 698235: 'Blocked'}
+LEAVE_TYPE_IDS = {"Vacation": 8616592, "Sick": 8616593, "Parental Leave": 8616594}
+
+def make_sheet(sheet_id, name, titles, rows, summary=(), column_types=None):
+    '''a FakeSmartsheetApi sheet, rows are {title: value} dicts, summary is [(title, displayValue)]'''
+    now = datetime.datetime.now(datetime.timezone.utc)
+    columns = [{'id': sheet_id * 100 + i, 'index': i, 'title': title, 'type': (column_types or {}).get(title, 'TEXT_NUMBER'), 'primary': i == 0}
+               for i, title in enumerate(titles)]
+    title_to_id = {column['title']: column['id'] for column in columns}
+    return {
+        'id': sheet_id, 'name': name, 'version': 1, 'modifiedAt': now, 'columns': columns,
+        'rows': [{'id': sheet_id * 10**5 + i, 'modifiedAt': now, 'cells': {title_to_id[title]: value for title, value in row.items() if value is not None}}
+                 for i, row in enumerate(rows)],
+        'summary': [{'id': sheet_id * 10 + i, 'index': i, 'title': title, 'type': 'TEXT_NUMBER', 'displayValue': value, 'objectValue': value}
+                    for i, (title, value) in enumerate(summary)],
+    }
+def short_date(date):
+    '''m/d/yyyy w/o leading zeros, like the script keys'''
+    return f"{date.month}/{date.day}/{date.year}"
+def synthetic_apis(projects, days=20, latency=0.0, seed=0):
+    '''seeds a FakeRmApi and a FakeSmartsheetApi w/ `projects` rm projects (most w/ a project sheet) and about as many users,
+    each logging time on a few of the projects for `days` weekdays
+    the data is a mix of in sync and out of sync on purpose, so every branch of a run does some work:
+    time entries that are current / have different hours / are missing from rm / are on jobs rm doesn't have, sheet names that need their star added or removed,
+    project metadata that differs, assignments whose status differs, and a few archived projects that still need renaming
+    returns (rm_api, ss_api, config), config has the ids/maps SmartsheetRmAdmin needs (tokens and urls are left to the caller), the servers aren't started'''
+    rng = random.Random(seed)
+    users = [{'id': 5000 + i, 'email': f"User{i}@DowbuiltCT.com", 'display_name': f"User {i}", 'employee_number': str(1000 + i)}
+             for i in range(max(5, projects))]
+    # a user rm has no email for, like service accounts
+    users.append({'id': 4999, 'email': None, 'display_name': 'Scheduler', 'employee_number': None})
+    rm_projects, custom_field_values, assignments = {}, {}, {}
+    for i in range(projects):
+        project_id = 7 * 10**5 + i
+        job_num = f"2{i:04d}"
+        rm_projects[project_id] = {'id': project_id, 'name': f"{job_num} Project {i}", 'project_code': job_num if i % 17 else f"{job_num}.1",
+                                   'client': rng.choice(['Seattle', 'Portland', 'Bend']), 'archived': i % 50 == 49}
+        custom_field_values[project_id] = [
+            {'id': project_id * 10 + 1, 'custom_field_name': 'Architect', 'value': rng.choice(['Olson', 'Miller Hull', 'LMN'])},
+            {'id': project_id * 10 + 2, 'custom_field_name': 'Project Enumerator', 'value': str(i)},
+            {'id': project_id * 10 + 3, 'custom_field_name': 'DCT Status', 'value': rng.choice(['Active', 'Preconstruction', 'Closeout'])},
+        ]
+        assignments[project_id] = [{
+            'id': project_id * 100 + task,
+            'description': f"Task {task}",
+            'status_option_id': rng.choice(list(STATUS_IDS)),
+            # percents that custom_round leaves alone, so the backend keys below come out the same as the script's
+            'percent': rng.choice([0.2, 0.5, 0.8, 1.0]),
+            'starts_at': str(datetime.date(2024, 1, 1) + datetime.timedelta(days=rng.randint(0, 60))),
+            'ends_at': str(datetime.date(2024, 4, 1) + datetime.timedelta(days=rng.randint(0, 60))),
+        } for task in range(rng.randint(3, 8))]
+    project_ids = [project_id for project_id, project in rm_projects.items() if not project['archived']]
+
+    # hh2 time: per user, day and job one total, split over 1-2 hh2 rows
+    dates = [datetime.date(2024, 1, 1) + datetime.timedelta(days=i) for i in range(days * 7 // 5 + 7)]
+    dates = [date for date in dates if date.weekday() < 5][:days]
+    hh2_rows, time_entries = [], {user['id']: [] for user in users}
+    entry_ids = itertools.count(10**7)
+    for user in users[:-1]:
+        user_jobs = [rm_projects[project_id] for project_id in rng.sample(project_ids, min(3, len(project_ids)))]
+        # ~5% of people are in hh2 but not rm
+        employee_number = user['employee_number'] if rng.random() > 0.05 else str(9000 + user['id'])
+        for date in dates:
+            for project in rng.sample(user_jobs, rng.randint(1, len(user_jobs))):
+                job_num = project['project_code'].split('.')[0]
+                if rng.random() < 0.03:
+                    # a job rm doesn't have (yet)
+                    job_num = f"3{rng.randint(0, 9999):04d}"
+                hours = rng.choice([2.0, 4.0, 6.0, 8.0, 8.5])
+                parts = [hours] if rng.random() < 0.7 else [hours / 2, hours / 2]
+                for part in parts:
+                    approval = 'Sealed' if rng.random() > 0.03 else 'Pending'
+                    hh2_rows.append({
+                        'EmployeeNumber': employee_number, 'EmployeeName': user['display_name'], 'Date': str(date), 'PayrollGroup': 'Weekly',
+                        'PayrollServiceId': '1', 'Job': job_num, 'JobName': project['name'], 'CostCode': '01-100',
+                        'CostCodeName': rng.choice(['Labor', 'Supervision', None]), 'CertifiedClass': None, 'CertifiedClassName': None,
+                        'PayType': 'REG', 'PayTypeName': 'Regular', 'Units': part, 'Description': rng.choice(['framing', 'punch list', 'site walk', None]),
+                        'ApprovalType': approval, 'Resulting Job Number': job_num,
+                        'Script Key': f"{employee_number}{short_date(date)}{job_num}{approval}", 'Script Message': None,
+                    })
+                # rm already has ~70% of it, ~10% w/ the wrong hours, the rest is missing
+                kind = rng.random()
+                if kind < 0.8 and job_num == project['project_code'].split('.')[0]:
+                    rm_hours = hours if kind < 0.7 else hours + 1
+                    rm_parts = [rm_hours] if rng.random() < 0.8 else [rm_hours - 1, 1.0]
+                    for rm_part in rm_parts:
+                        time_entries[user['id']].append({'id': next(entry_ids), 'user_id': user['id'], 'assignable_id': project['id'], 'date': str(date),
+                                                         'hours': rm_part, 'task': None, 'notes': None})
+    header = dict({title: title for title in HH2_COLUMNS}, **{'Resulting Job Number': 'Job', 'Script Key': 'EmployeeNumberDateJobApprovalType', 'Script Message': None})
+
+    hh2_sheet_id, hris_sheet_id, proj_list_sheet_id, workspace_id = 1780078719487876, 5956860349048708, 3858046490306436, 4883274435716996
+    sheets = {
+        hh2_sheet_id: make_sheet(hh2_sheet_id, 'HH2 Data', HH2_COLUMNS, [header] + hh2_rows, column_types={'Date': 'DATE'}),
+        hris_sheet_id: make_sheet(hris_sheet_id, 'HRIS Data', ['emailAsText', 'sage_id'],
+                                  [{'emailAsText': user['email'], 'sage_id': user['employee_number']} for user in users if user['email']]),
+        proj_list_sheet_id: make_sheet(proj_list_sheet_id, 'Project List', ['Project Name'], [{'Project Name': project['name']} for project in rm_projects.values()]),
+    }
+    workspace_sheets = []
+    for i, (project_id, project) in enumerate(rm_projects.items()):
+        if project['archived']:
+            continue
+        kind = rng.random()
+        if kind < 0.8:
+            # connected, a few still have the star from before they were
+            name = project['name'] + ('*' if kind < 0.04 else '')
+        else:
+            # not in rm (yet), half of them haven't been starred
+            name = f"9{i:04d} Pursuit {i}" + ('*' if kind < 0.9 else '')
+        fields = {field['custom_field_name']: field['value'] for field in custom_field_values[project_id]}
+        summary = [
+            ('Build Job Number', project['project_code'] if rng.random() > 0.1 else project['project_code'] + '0'),
+            ('Build Region', project['client']),
+            ('Build Architect', fields['Architect']),
+            ('Project Enumerator [MANUAL ENTRY]', fields['Project Enumerator']),
+            ('DCT Status', fields['DCT Status'] if rng.random() > 0.1 else 'On Hold'),
+        ]
+        task_rows = [{'Task Name': 'Schedule', 'Project': None, 'Task Name - Backend Key': None, 'Task Status': None}]
+        for assignment in assignments[project_id]:
+            start, end = assignment['starts_at'].split('-'), assignment['ends_at'].split('-')
+            backend_key = f"{assignment['description']}|{assignment['percent']:g}|{start[1]}/{start[2]}/{start[0][2:]}|{end[1]}/{end[2]}/{end[0][2:]}"
+            status = STATUS_IDS[assignment['status_option_id']]
+            task_rows.append({'Task Name': assignment['description'], 'Project': project['name'], 'Task Name - Backend Key': backend_key,
+                              'Task Status': status if rng.random() > 0.15 else 'Planned'})
+        sheet_id = 6 * 10**15 + project_id
+        sheets[sheet_id] = make_sheet(sheet_id, name, PROJECT_COLUMNS, task_rows, summary)
+        workspace_sheets.append(sheet_id)
+
+    rm_api = FakeRmApi(users, rm_projects, custom_field_values, assignments, time_entries, LEAVE_TYPE_IDS.values(), latency=latency)
+    ss_api = FakeSmartsheetApi(sheets, {workspace_id: workspace_sheets}, latency=latency)
+    config = {
+        'hh2_data_sheetid': hh2_sheet_id,
+        'hris_data_sheetid': hris_sheet_id,
+        'proj_workspace_id': workspace_id,
+        'proj_list_sheetid': proj_list_sheet_id,
+        'rm_to_ss_status_ids': dict(STATUS_IDS),
+        'rm_leave_type_ids': dict(LEAVE_TYPE_IDS),
+    }
+    return rm_api, ss_api, config
+#endregion
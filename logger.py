@@ -1,18 +1,30 @@
 from datetime import datetime
+import atexit
 import os
 import sys
-import inspect
+import threading
 import time
 
 class ghetto_logger:
-    '''to deploy in class, put self.log=ghetto_logger("<module name>.py"), then ctr f and replace print( w/ self.log.log('''
-    def __init__(self, title, print = True):
+    '''to deploy in class, put self.log=ghetto_logger("<module name>.py"), then ctr f and replace print( w/ self.log.log(
+    lines below `level` are dropped before any work is done (levels are debug < info < warning < error, log() defaults to info)
+    log.txt is kept open and written through a buffer, flushed every flush_interval seconds, on release() and when the program exits'''
+    levels = {'debug': 10, 'info': 20, 'warning': 30, 'error': 40}
+
+    def __init__(self, title, print = True, level = "info", flush_interval = 5):
         raw_now = datetime.now()
         self.print= print
+        self.level = self.levels[level]
+        self.flush_interval = flush_interval
         self.now = raw_now.strftime("%m/%d/%Y %H:%M:%S")
         self.first_use=True
         self.first_line_stamp  = f"{self.now}  {title}--"
         self.start_time = time.time()
+        # lines held by hold() are per thread, the lock keeps released groups from interleaving
+        self.held = threading.local()
+        self.lock = threading.Lock()
+        self.file = None
+        self.last_flush = time.time()
         if os.name == 'nt':
             current_file_path = os.path.abspath(__file__)
             directory = os.path.dirname(current_file_path)
@@ -20,38 +32,73 @@ class ghetto_logger:
             self.path = os.path.join(directory, logger_name)
         else:
             self.path ="log.txt"
+        atexit.register(self.close)
 
-    def timestamp(self): 
+    def timestamp(self):
         '''creates a string of minute/second from start_time until now for logging'''
         end_time = time.time()  # get the end time of the program
-        elapsed_time = end_time - self.start_time  # calculate the elapsed time in seconds       
+        elapsed_time = end_time - self.start_time  # calculate the elapsed time in seconds
 
-        minutes, seconds = divmod(elapsed_time, 60)  # convert to minutes and seconds       
+        minutes, seconds = divmod(elapsed_time, 60)  # convert to minutes and seconds
         timestamp = "{:02d}:{:02d}".format(int(minutes), int(seconds))
-        
+
         return timestamp
-    
-    def log(self, text, type = "new_line", mode="a"):
+
+    def log(self, text, type = "new_line", mode="a", level = "info"):
+        if self.levels[level] < self.level:
+            return
         # so lists/dictionaries/etc can be logged without issue
         text = str(text)
 
-        function_name = inspect.currentframe().f_back.f_code.co_name
-        
-        try:
-            module_name = inspect.getmodule(inspect.stack()[1][0]).__name__
-        except:
-            module_name = "__main__"
+        # one hop up to the caller, inspect.stack() would build (and read the source of) every frame on the stack
+        caller = sys._getframe(1)
+        function_name = caller.f_code.co_name
+        module_name = caller.f_globals.get('__name__', "__main__")
 
         func_stamp = f"{self.timestamp()}  {module_name}.{function_name}(): "
 
+        if getattr(self.held, 'lines', None) is not None:
+            self.held.lines.append((func_stamp, text, type, mode))
+        else:
+            with self.lock:
+                self.write(func_stamp, text, type, mode)
+                self.flush(force=False)
+    def hold(self):
+        '''from now until release(), this thread's lines are kept back (stamped w/ the time they were logged)
+        so work running in parallel threads still shows up as one group per task'''
+        self.held.lines = []
+    def release(self):
+        '''writes out this thread's held lines in one go'''
+        lines, self.held.lines = getattr(self.held, 'lines', None) or [], None
+        with self.lock:
+            for func_stamp, text, type, mode in lines:
+                self.write(func_stamp, text, type, mode)
+            self.flush()
+    def write(self, func_stamp, text, type, mode):
         if self.print == True:
             print(f"{func_stamp} {text}")
 
-        with open(self.path, mode=mode) as file:
-            if self.first_use == True:
-                file.write("\n" + "\n"+ self.first_line_stamp)
-                self.first_use = False
-            if self.first_use == False and type == "paragraph":
-                file.write(text)
-            elif self.first_use == False:
-                file.write("\n  " + func_stamp + text)
\ No newline at end of file
+        if self.file is None or mode != "a":
+            # anything but append (ie "w") reopens the file in that mode, then it carries on appending
+            if self.file is not None:
+                self.file.close()
+            self.file = open(self.path, mode=mode)
+        file = self.file
+        if self.first_use == True:
+            file.write("\n" + "\n"+ self.first_line_stamp)
+            self.first_use = False
+        if self.first_use == False and type == "paragraph":
+            file.write(text)
+        elif self.first_use == False:
+            file.write("\n  " + func_stamp + text)
+    def flush(self, force=True):
+        '''pushes buffered lines to log.txt, w/o force only if flush_interval has passed since the last flush'''
+        if self.file is None or not (force or time.time() - self.last_flush >= self.flush_interval):
+            return
+        self.file.flush()
+        self.last_flush = time.time()
+    def close(self):
+        with self.lock:
+            if self.file is not None:
+                self.file.close()
+                self.file = None
@@ -0,0 +1,116 @@
+from contextlib import contextmanager
+from datetime import datetime
+from urllib.parse import urlparse
+import bisect
+import json
+import os
+import re
+import threading
+import time
+
+def endpoint_name(url):
+    '''groups calls to the same endpoint: "https://api.rm.smartsheet.com/api/v1/users/123/time_entries?page=2" -> "/api/v1/users/{id}/time_entries"'''
+    return re.sub(r'/\d+(?=/|$)', '/{id}', urlparse(url).path)
+
+class PerfRecorder:
+    """
+    Collects where a run spends its time: api calls (count, latency histogram, retries, bytes, rows), phases, and plain counters.
+    One recorder is shared by the RM client, every grid (grid.perf) and SmartsheetRmAdmin, it is thread safe.
+
+    Methods:
+    --------
+    timed(category, name, **fields) -> context manager:
+        times the block as one call of category/name, yields a dict the block can fill in
+        (retries, bytes_sent, bytes_received, rows, error), an exception in the block counts as an error.
+    record(category, name, seconds, retries=0, bytes_sent=0, bytes_received=0, rows=0, error=False) -> None
+    phase(name) -> context manager:
+        times one phase of the run (ie grab_rm_data), phases are reported in the order they ran.
+    count(name, n=1) -> None:
+        adds to a plain counter (ie rows processed).
+    report() -> dict
+    write_report(path) -> None:
+        report() as json.
+    """
+    # upper bounds (ms) of the latency histogram buckets, anything slower lands in the last bucket
+    buckets_ms = [10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000]
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.started_at = datetime.now()
+        self.start_time = time.perf_counter()
+        # {(category, name): stats}
+        self.calls = {}
+        self.phases = []
+        self.counters = {}
+    @contextmanager
+    def timed(self, category, name, **fields):
+        info = dict(fields)
+        start = time.perf_counter()
+        error = False
+        try:
+            yield info
+        except BaseException:
+            error = True
+            raise
+        finally:
+            info['error'] = info.get('error', False) or error
+            self.record(category, name, time.perf_counter() - start, **info)
+    def record(self, category, name, seconds, retries=0, bytes_sent=0, bytes_received=0, rows=0, error=False):
+        bucket = bisect.bisect_left(self.buckets_ms, seconds * 1000)
+        with self.lock:
+            stats = self.calls.get((category, name))
+            if stats is None:
+                stats = self.calls[(category, name)] = {'calls': 0, 'errors': 0, 'retries': 0, 'seconds': 0.0, 'max_seconds': 0.0,
+                                                        'bytes_sent': 0, 'bytes_received': 0, 'rows': 0, 'histogram': [0] * (len(self.buckets_ms) + 1)}
+            stats['calls'] += 1
+            stats['errors'] += bool(error)
+            stats['retries'] += retries
+            stats['seconds'] += seconds
+            stats['max_seconds'] = max(stats['max_seconds'], seconds)
+            stats['bytes_sent'] += bytes_sent
+            stats['bytes_received'] += bytes_received
+            stats['rows'] += rows
+            stats['histogram'][bucket] += 1
+    @contextmanager
+    def phase(self, name):
+        start = time.perf_counter()
+        error = False
+        try:
+            yield
+        except BaseException:
+            error = True
+            raise
+        finally:
+            with self.lock:
+                self.phases.append({'name': name, 'seconds': round(time.perf_counter() - start, 3), 'error': error})
+    def count(self, name, n=1):
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+    def report(self):
+        '''calls are sorted slowest (total time) first, so the endpoint to look at is on top'''
+        bucket_names = [f"<={bound}ms" for bound in self.buckets_ms] + [f">{self.buckets_ms[-1]}ms"]
+        with self.lock:
+            calls = [{
+                'category': category,
+                'name': name,
+                **{key: value for key, value in stats.items() if key != 'histogram'},
+                'seconds': round(stats['seconds'], 3),
+                'mean_seconds': round(stats['seconds'] / stats['calls'], 4),
+                'max_seconds': round(stats['max_seconds'], 3),
+                'histogram': dict(zip(bucket_names, stats['histogram'])),
+            } for (category, name), stats in self.calls.items()]
+            phases = list(self.phases)
+            counters = dict(self.counters)
+        return {
+            'started_at': self.started_at.isoformat(timespec='seconds'),
+            'seconds': round(time.perf_counter() - self.start_time, 3),
+            'phases': phases,
+            'calls': sorted(calls, key=lambda call: call['seconds'], reverse=True),
+            'counters': counters,
+        }
+    def write_report(self, path):
+        # write then rename so a half written report never replaces the last good one
+        tmp_path = path + ".tmp"
+        with open(tmp_path, 'w') as file:
+            json.dump(self.report(), file, indent=2)
+        os.replace(tmp_path, path)
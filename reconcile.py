@@ -0,0 +1,61 @@
+from operator import itemgetter
+import numpy as np
+import pandas as pd
+
+KEYS = ['key_email', 'key_date', 'key_job']
+
+def column(records, key):
+    return list(map(itemgetter(key), records))
+
+def aggregate_rm_timedata(rm_timedata, rm_id_to_jobnum, userid_to_email):
+    '''rm time entries (the dicts from the api) -> (rm_agg, rm_entries)
+    rm_entries has one row per entry: key_email, key_date, key_job (normalized like the old f-string keys, lowercased email and str date/job), hours and id
+    rm_agg has one row per (email, date, job number), in first seen order, w/ the hours summed (rm_hours)
+    entries on a project w/o a job number fall under "no_job_num", entries of users we don't know can't match anything so they are dropped'''
+    emails = {user_id: email.lower() for user_id, email in userid_to_email.items() if email is not None}
+    job_nums = {assignable_id: str(job_num) for assignable_id, job_num in rm_id_to_jobnum.items()}
+    rm_entries = pd.DataFrame({
+        'key_email': pd.Series(column(rm_timedata, 'user_id'), dtype=object).map(emails).astype(object),
+        'key_date': pd.Series([str(date) for date in column(rm_timedata, 'date')], dtype=object),
+        'key_job': pd.Series(column(rm_timedata, 'assignable_id'), dtype=object).map(job_nums).fillna("no_job_num").astype(object),
+        'hours': pd.Series(column(rm_timedata, 'hours'), dtype=float),
+        'id': pd.Series(column(rm_timedata, 'id'), dtype=object),
+    })
+    rm_entries = rm_entries[rm_entries['key_email'].notna()].reset_index(drop=True)
+    rm_agg = rm_entries.groupby(KEYS, sort=False).agg(rm_hours=('hours', 'sum')).reset_index()
+    return rm_agg, rm_entries
+
+def reconcile_timedata(hh2_timedata, rm_agg, rm_entries):
+    '''matches the hh2 time entries against aggregate_rm_timedata's frames
+    hh2_timedata is a frame (or list of dicts) w/ user_email, date, job_num, hours and rm_proj_id, like flat_hh2_records
+    returns a frame in the same order as hh2_timedata w/
+    action: 'current' (hours match), 'update' (hours differ, rm_entry_id holds the list of rm entry ids to replace) or 'add' (no rm entries)
+    needs_project: an 'add' whose job number isn't an rm project yet'''
+    hh2 = hh2_timedata if isinstance(hh2_timedata, pd.DataFrame) else pd.DataFrame(hh2_timedata, columns=['user_email', 'date', 'job_num', 'hours', 'rm_proj_id'])
+    hh2 = hh2.reset_index(drop=True)
+    keys = pd.DataFrame({
+        'key_email': pd.Series([str(email).lower() for email in hh2['user_email'].tolist()], dtype=object),
+        'key_date': pd.Series([str(date) for date in hh2['date'].tolist()], dtype=object),
+        'key_job': pd.Series([str(job_num) for job_num in hh2['job_num'].tolist()], dtype=object),
+    })
+    # rm_agg has one row per key, so the left merge keeps hh2's rows and order
+    merged = keys.merge(rm_agg, how='left', on=KEYS, indicator=True)
+    matched = (merged['_merge'] == 'both').to_numpy()
+    update = matched & (merged['rm_hours'].to_numpy(dtype=float) != hh2['hours'].to_numpy(dtype=float))
+    action = np.where(matched, np.where(update, 'update', 'current'), 'add').astype(object)
+    needs_project = ~matched & (hh2['rm_proj_id'].to_numpy(dtype=object) == '')
+
+    # entry ids are only needed for the updates, rm_entries goes on the left so each list stays in entry order
+    rm_entry_id = np.full(len(hh2), None, dtype=object)
+    to_update = keys[update].rename_axis('row').reset_index()
+    update_entries = rm_entries[KEYS + ['id']].merge(to_update, on=KEYS)
+    # a plain loop, groupby(...).agg(list) builds a sub frame per group and is many times slower
+    for row, entry_id in zip(update_entries['row'].tolist(), update_entries['id'].tolist()):
+        if rm_entry_id[row] is None:
+            rm_entry_id[row] = []
+        rm_entry_id[row].append(entry_id)
+    return pd.DataFrame({
+        'action': action,
+        'rm_entry_id': rm_entry_id,
+        'needs_project': needs_project,
+    })
@@ -0,0 +1,182 @@
+import asyncio
+import json
+import requests
+from requests.adapters import HTTPAdapter
+from throttle import Throttler
+from perf import PerfRecorder, endpoint_name
+
+class RmClient:
+    """
+    A thin client for the Resource Management (RM) API.
+
+    Every RM call goes through one requests.Session so connections are pooled and kept alive
+    across the thousands of calls in a run, instead of opening a fresh TLS connection per call.
+    Calls are paced by a throttle.Throttler, 429 responses are retried after their Retry-After.
+
+    Attributes:
+    -----------
+    base_url : str
+        Root of the RM API, endpoints are appended to this.
+    timeout : float or tuple
+        (connect, read) timeout in seconds passed to every request.
+    session : requests.Session
+        The pooled session, carries the auth header.
+    throttler : Throttler
+        paces every call, can be shared w/ other clients of the same token.
+    perf : PerfRecorder
+        every request is timed into it under "<METHOD> <endpoint>" (ids replaced w/ {id}), w/ its retries and bytes.
+
+    Methods:
+    --------
+    get(endpoint, params=None) -> Response
+    put(endpoint, data=None) -> Response
+    post(endpoint, data=None) -> Response
+    delete(endpoint) -> Response
+        endpoint can be a path ('/api/v1/users') or a full url (like the paging 'next' links),
+        data is a dict that gets json encoded.
+    """
+
+    def __init__(self, token, base_url='https://api.rm.smartsheet.com', pool_size=10, timeout=(10, 60), throttler=None, perf=None):
+        self.base_url = base_url
+        self.timeout = timeout
+        self.throttler = throttler or Throttler(rate=10)
+        self.perf = perf or PerfRecorder()
+        self.session = requests.Session()
+        self.session.headers.update({
+            'Content-Type': 'application/json',
+            'auth': token
+        })
+        # one host, so one pool that can hold pool_size live connections (should be >= the number of worker threads)
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+    def build_url(self, endpoint):
+        '''endpoints that are already full urls are left alone'''
+        if endpoint.startswith('http'):
+            return endpoint
+        return f"{self.base_url}{endpoint}"
+    def request(self, method, endpoint, **kwargs):
+        '''sends the request once the throttler allows it, a 429 is retried up to throttler.max_retries times
+        (the last response is returned as is if it is still rate limited)'''
+        kwargs.setdefault('timeout', self.timeout)
+        url = self.build_url(endpoint)
+        attempt = 0
+        with self.perf.timed('rm', f"{method} {endpoint_name(url)}", bytes_sent=len(kwargs.get('data') or '')) as info:
+            while True:
+                self.throttler.acquire()
+                response = self.session.request(method, url, **kwargs)
+                if response.status_code == 429 and attempt < self.throttler.max_retries:
+                    self.throttler.on_rate_limited(self.throttler.backoff_delay(attempt, response.headers.get('Retry-After')))
+                    attempt += 1
+                    continue
+                self.throttler.on_success()
+                info.update(retries=attempt, bytes_received=len(response.content), error=response.status_code >= 400)
+                return response
+    def get(self, endpoint, params=None):
+        return self.request('GET', endpoint, params=params)
+    def put(self, endpoint, data=None):
+        return self.request('PUT', endpoint, data=json.dumps(data))
+    def post(self, endpoint, data=None):
+        return self.request('POST', endpoint, data=json.dumps(data))
+    def delete(self, endpoint):
+        return self.request('DELETE', endpoint)
+    def close(self):
+        self.session.close()
+
+class RmResponse:
+    '''what AsyncRmClient hands back, the parts of a requests.Response the admin reads (status_code, reason, headers, content, json())'''
+    def __init__(self, status_code, reason, headers, content):
+        self.status_code = status_code
+        self.reason = reason
+        self.headers = headers
+        self.content = content
+    def json(self):
+        return json.loads(self.content)
+
+class AsyncRmClient:
+    """
+    The asyncio version of RmClient, for running many RM calls at once from one thread (see SmartsheetRmAdmin.run_async).
+
+    Calls share one aiohttp session (pooled, keep-alive connections), at most `concurrency` are in flight at once,
+    and they are paced by the same kind of Throttler as RmClient (it can be the same instance, so both clients stay inside one rate limit).
+    aiohttp is only needed once a call is made, so this module still imports w/o it.
+    An aiohttp session belongs to the event loop it was made in, make one client per asyncio.run and close() it at the end.
+
+    Attributes:
+    -----------
+    base_url : str
+        Root of the RM API, endpoints are appended to this.
+    concurrency : int
+        calls allowed in flight at once (also the connection pool size).
+    timeout : float or tuple
+        (connect, read) timeout in seconds.
+    throttler : Throttler
+    perf : PerfRecorder
+        every request is timed into it under the same names as RmClient's.
+
+    Methods:
+    --------
+    async get(endpoint, params=None) -> RmResponse
+    async put(endpoint, data=None) -> RmResponse
+    async post(endpoint, data=None) -> RmResponse
+    async delete(endpoint) -> RmResponse
+        same arguments as RmClient's.
+    async close() -> None
+    """
+
+    def __init__(self, token, base_url='https://api.rm.smartsheet.com', concurrency=10, timeout=(10, 60), throttler=None, perf=None):
+        self.token = token
+        self.base_url = base_url
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self.throttler = throttler or Throttler(rate=10)
+        self.perf = perf or PerfRecorder()
+        self.semaphore = asyncio.Semaphore(concurrency)
+        self.session = None
+    def open_session(self):
+        '''the aiohttp session, made on the first call so it is made inside the running loop'''
+        if self.session is None:
+            try:
+                import aiohttp
+            except ImportError:
+                raise ImportError("the async rm client needs aiohttp (pip install aiohttp), or set rm_async to False") from None
+            connect_timeout, read_timeout = self.timeout if isinstance(self.timeout, tuple) else (self.timeout, self.timeout)
+            self.session = aiohttp.ClientSession(
+                headers={'Content-Type': 'application/json', 'auth': self.token},
+                connector=aiohttp.TCPConnector(limit=self.concurrency),
+                timeout=aiohttp.ClientTimeout(sock_connect=connect_timeout, sock_read=read_timeout))
+        return self.session
+    def build_url(self, endpoint):
+        '''endpoints that are already full urls are left alone'''
+        if endpoint.startswith('http'):
+            return endpoint
+        return f"{self.base_url}{endpoint}"
+    async def request(self, method, endpoint, params=None, data=None):
+        '''same as RmClient.request: waits for its turn (w/o blocking the loop), a 429 is retried up to throttler.max_retries times'''
+        url = self.build_url(endpoint)
+        attempt = 0
+        async with self.semaphore:
+            with self.perf.timed('rm', f"{method} {endpoint_name(url)}", bytes_sent=len(data or '')) as info:
+                while True:
+                    await asyncio.sleep(self.throttler.reserve())
+                    async with self.open_session().request(method, url, params=params, data=data) as response:
+                        result = RmResponse(response.status, response.reason, response.headers, await response.read())
+                    if result.status_code == 429 and attempt < self.throttler.max_retries:
+                        self.throttler.on_rate_limited(self.throttler.backoff_delay(attempt, result.headers.get('Retry-After')))
+                        attempt += 1
+                        continue
+                    self.throttler.on_success()
+                    info.update(retries=attempt, bytes_received=len(result.content), error=result.status_code >= 400)
+                    return result
+    async def get(self, endpoint, params=None):
+        return await self.request('GET', endpoint, params=params)
+    async def put(self, endpoint, data=None):
+        return await self.request('PUT', endpoint, data=json.dumps(data))
+    async def post(self, endpoint, data=None):
+        return await self.request('POST', endpoint, data=json.dumps(data))
+    async def delete(self, endpoint):
+        return await self.request('DELETE', endpoint)
+    async def close(self):
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
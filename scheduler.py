@@ -0,0 +1,93 @@
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from contextlib import nullcontext
+
+class PhaseScheduler:
+    """
+    Runs a run's phases as a small dependency graph: each phase declares what it needs and what it gives,
+    a phase starts as soon as every phase giving what it needs has finished, so phases that don't depend on each other overlap
+    and the run takes as long as its longest chain instead of the sum of its phases.
+
+    Attributes:
+    -----------
+    max_workers : int
+        phases allowed to run at once, 1 runs them one after the other in the order they were added.
+    wrap : callable, optional
+        wrap(name) -> context manager each phase runs inside (ie perf.PerfRecorder.phase).
+    status : dict
+        {phase name: 'done', 'failed' or 'skipped'} for the phases of the last run(), a phase is skipped when something it needs (or runs after) failed.
+
+    Methods:
+    --------
+    add(name, fn, needs=(), gives=(), after=()) -> None:
+        fn is called w/o arguments, needs/gives are names of the data (ie 'rm_projects') passed between phases.
+        after names phases that have to finish first when they are part of the run, w/o pulling them into it like a need would.
+    resolve(names=None) -> List[str]:
+        names plus every phase giving something they need (recursively), in the order they were added.
+    run(names=None) -> dict:
+        runs resolve(names) (all phases by default) and returns status, the first error is raised once every phase that could run has finished.
+    """
+
+    def __init__(self, max_workers=2, wrap=None):
+        self.max_workers = max(1, max_workers)
+        self.wrap = wrap or (lambda name: nullcontext())
+        # {name: (fn, needs, gives, after)}, in the order added
+        self.phases = {}
+        self.status = {}
+    def add(self, name, fn, needs=(), gives=(), after=()):
+        self.phases[name] = (fn, tuple(needs), tuple(gives), tuple(after))
+    def givers(self, need, names):
+        return [name for name in names if need in self.phases[name][2]]
+    def resolve(self, names=None):
+        names = list(self.phases) if names is None else list(names)
+        unknown = [name for name in names if name not in self.phases]
+        if unknown:
+            raise ValueError(f"unknown phase(s) {unknown}, the phases are {list(self.phases)}")
+        selected = set()
+        while names:
+            name = names.pop()
+            if name in selected:
+                continue
+            selected.add(name)
+            for need in self.phases[name][1]:
+                givers = self.givers(need, self.phases)
+                if not givers:
+                    raise ValueError(f"{name} needs {need}, which no phase gives")
+                names.extend(givers)
+        return [name for name in self.phases if name in selected]
+    def run_phase(self, name):
+        with self.wrap(name):
+            self.phases[name][0]()
+    def run(self, names=None):
+        pending = self.resolve(names)
+        selected = list(pending)
+        self.status = {}
+        errors = []
+        running = {}
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            while pending or running:
+                progressed = False
+                for name in list(pending):
+                    givers = [giver for need in self.phases[name][1] for giver in self.givers(need, selected)]
+                    givers += [before for before in self.phases[name][3] if before in selected]
+                    if any(self.status.get(giver) in ('failed', 'skipped') for giver in givers):
+                        pending.remove(name)
+                        self.status[name] = 'skipped'
+                        progressed = True
+                    elif all(self.status.get(giver) == 'done' for giver in givers) and len(running) < self.max_workers:
+                        pending.remove(name)
+                        running[executor.submit(self.run_phase, name)] = name
+                        progressed = True
+                if not running:
+                    if not progressed:
+                        raise ValueError(f"{pending} can't start, their needs go in a circle")
+                    continue
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    name = running.pop(future)
+                    error = future.exception()
+                    self.status[name] = 'failed' if error else 'done'
+                    if error:
+                        errors.append(error)
+        if errors:
+            raise errors[0]
+        return self.status
@@ -0,0 +1,52 @@
+import hashlib
+import json
+import os
+import threading
+
+class SheetStateStore:
+    """
+    Remembers, per project sheet and per phase ('metadata', 'assignments'), what both sides looked like
+    the last time they were checked and found in sync, so the next run can skip sheets where neither side moved.
+
+    The smartsheet side is a marker (the sheet's modifiedAt from the workspace listing, or its version),
+    the rm side is a digest of the rm data the phase compares against. Stored as json at `path`.
+
+    Methods:
+    --------
+    digest(data) -> str:
+        a stable hash of any json-able data.
+    unchanged(sheet_id, phase, sheet_marker, rm_digest) -> bool:
+        True if both sides match what was recorded for that sheet/phase.
+    record(sheet_id, phase, sheet_marker, rm_digest) -> None:
+        remembers the in sync state (only call when nothing needed updating).
+    save() -> None
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+        try:
+            with open(path) as file:
+                self.state = json.load(file)
+        except (OSError, ValueError):
+            self.state = {}
+    @staticmethod
+    def digest(data):
+        return hashlib.sha1(json.dumps(data, sort_keys=True, default=str).encode()).hexdigest()
+    def unchanged(self, sheet_id, phase, sheet_marker, rm_digest):
+        if sheet_marker is None:
+            return False
+        with self.lock:
+            entry = self.state.get(str(sheet_id), {}).get(phase)
+        return entry == {'sheet': sheet_marker, 'rm': rm_digest}
+    def record(self, sheet_id, phase, sheet_marker, rm_digest):
+        if sheet_marker is None:
+            return
+        with self.lock:
+            self.state.setdefault(str(sheet_id), {})[phase] = {'sheet': sheet_marker, 'rm': rm_digest}
+    def save(self):
+        with self.lock:
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, 'w') as file:
+                json.dump(self.state, file)
+            os.replace(tmp_path, self.path)
@@ -1,10 +1,90 @@
 #!/usr/bin/env python
 
+import importlib
 import smartsheet
+from smartsheet.smartsheet import OperationErrorResult, DefaultCalcBackoff
+from smartsheet.util import fresh_operation
 import pandas as pd
 import datetime
-import time
+import hashlib
 import math
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from smartsheet.exceptions import ApiError
+from throttle import Throttler
+from perf import PerfRecorder
+
+def is_rate_limit_error(error):
+    '''true if an sdk exception is smartsheet saying we went over the rate limit (429 / error code 4003)'''
+    if not isinstance(error, ApiError):
+        return False
+    result = getattr(error.error, 'result', None)
+    return getattr(result, 'status_code', None) == 429 or getattr(result, 'error_code', None) == 4003
+
+def rate_limit_retry_after(error):
+    '''the Retry-After header of the response an sdk exception came from, None if there isn't one'''
+    response = getattr(getattr(error, 'error', None), 'request_response', None)
+    return response.headers.get('Retry-After') if response is not None else None
+
+class ThrottlerBackoff(DefaultCalcBackoff):
+    '''the sdk's own retry backoff (for 500s, busy server...), except rate limits, those are handed back right away so grid.throttler
+    can pause every caller, slow down and honor Retry-After, instead of the sdk sleeping on them for up to max_retry_time first'''
+    def calc_backoff(self, previous_attempts, total_elapsed_time, error_result):
+        if error_result.status_code == 429 or error_result.code == 4003:
+            return -1
+        return super().calc_backoff(previous_attempts, total_elapsed_time, error_result)
+
+def smartsheet_client(token, api_base):
+    '''an sdk client (errors as exceptions) that leaves rate limits to grid.throttler, see ThrottlerBackoff'''
+    smart = smartsheet.Smartsheet(access_token=token, api_base=api_base, max_retry_time=ThrottlerBackoff(30))
+    smart.errors_as_exceptions(True)
+    return smart
+
+def is_retryable_write_error(error):
+    '''true if a failed write is safe to send again: smartsheet turned it away before doing anything (rate limit, or 4004 for a concurrent write to the same sheet)
+    other errors (ie a timeout) may have been applied, and sending add_rows again would post the rows twice'''
+    if is_rate_limit_error(error):
+        return True
+    result = getattr(getattr(error, 'error', None), 'result', None) if isinstance(error, ApiError) else None
+    return getattr(result, 'error_code', None) == 4004
+
+def sheet_content_to_df(content):
+    '''builds the sheet df from a get_sheet response (as a dict) in one columnar pass: each cell's 'Display Value' (or value if there is none) 
+    is appended straight to its column's list, then the df is made from those lists, w/ the row ids as the last column, "id"'''
+    titles = [column.get("title") for column in content.get("columns")]
+    arrays = [[] for _ in titles]
+    row_ids = []
+    for row in content.get("rows") or []:
+        row_ids.append(row.get("id"))
+        cells = row.get("cells")
+        for array, cell in zip(arrays, cells):
+            display_value = cell.get("displayValue")
+            array.append(cell.get("value") if display_value is None else display_value)
+        # short rows get padded like the row-wise DataFrame constructor would
+        for array in arrays[len(cells):]:
+            array.append(None)
+    df = pd.DataFrame(dict(zip(titles, arrays)), columns=titles)
+    # Should be row_id intead of id as that is less likely to be taken name space!!!
+    df["id"] = row_ids
+    return df
+
+def cell_matches(current, new):
+    '''true if posting `new` over a cell showing `current` (from the df) wouldn't change it, a miss only costs a write so it errs toward false:
+    blanks (None/NaN/"") match each other, a number matches by value (5 == "5" == 5.0), everything else (ie two strings, "7" vs "007") by its str'''
+    current_blank = current is None or current == "" or (isinstance(current, float) and math.isnan(current))
+    new_blank = new is None or new == "" or (isinstance(new, float) and math.isnan(new))
+    if current_blank or new_blank:
+        return current_blank and new_blank
+    if str(current) == str(new):
+        return True
+    # only when one side really is a number, two strings that parse to the same float ("1000" / "1e3") are different cells
+    if not any(isinstance(value, (int, float)) and not isinstance(value, bool) for value in (current, new)):
+        return False
+    try:
+        return float(current) == float(new)
+    except (TypeError, ValueError):
+        return False
 
 class grid:
     """
@@ -17,23 +97,51 @@ class grid:
     ----------
     Before using this class, the 'token' class attribute should be set 
     to the SMARTSHEET_ACCESS_TOKEN.
+    Every API call goes through the 'throttler' class attribute, which is shared by all
+    grid instances (one token = one rate limit), it can be swapped out like the token.
+    Every API call is also timed into the 'perf' class attribute (a perf.PerfRecorder), same idea.
 
     Attributes:
     -----------
     token : str, optional
         The access token for Smartsheet API.
+    api_base : str
+        Root of the Smartsheet API (class attribute), pointed elsewhere for offline runs (see fake_apis).
     grid_id : int
         ID of an existing Smartsheet sheet.
     grid_content : dict, optional
         Content of the sheet fetched from Smartsheet as a dictionary.
+    incremental : bool
+        Default mode for fetch_content, see fetch_content.
+    snapshot_cache : DiskCache, optional (class attribute)
+        When set, incremental snapshots are saved here so they carry over between runs.
 
     Methods:
     --------
+    api_call(fn, *args, **kwargs):
+        Runs a Smartsheet SDK call under the shared throttler, retrying with backoff when rate limited, timed under the call's name in perf.
+        A classmethod, so sdk calls that aren't about one grid (ie grid.api_call(smart.Workspaces.get_workspace, ...)) are timed the same way.
+
+    get_sheet_json(**query_params) -> dict:
+        Returns the raw get_sheet response as a dict, skipping the sdk's model objects (much faster on large sheets).
+
     get_column_df() -> DataFrame:
         Returns a DataFrame with details about the columns, such as title, type, options, etc.
 
-    fetch_content() -> None:
+    get_column_metadata(version: int=None, columns: List[Dict]=None) -> Tuple[DataFrame, Dict[str, int]]:
+        Returns the column DataFrame and a {title: column id} dict from the class level cache, keyed by sheet id and sheet version.
+
+    fetch_content(incremental: bool=None, column_titles: List[str]=None, include_summary: bool=False) -> None:
         Fetches the sheet content from Smartsheet and sets various attributes like columns, rows, row IDs, etc.
+        In incremental mode only the rows modified since the last snapshot are downloaded and merged into it.
+        column_titles limits the fetch (and the df) to those columns.
+        include_summary also builds 'summary_df' (same as fetch_summary_content's df) from the same request.
+
+    resolve_column_ids(column_titles: List[str], version: int=None) -> List[int]:
+        Returns the column ids for the titles that exist on the sheet.
+
+    fetch_row_ids() -> List[int]:
+        Returns the sheet's row ids in sheet order, w/o the rest of the cell data.
 
     fetch_summary_content() -> None:
         Fetches and constructs a summary DataFrame for summary columns.
@@ -44,14 +152,21 @@ class grid:
     grab_posting_column_ids(filtered_column_title_list: Union[str, List[str]]="all_columns") -> None:
         Prepares a dictionary for column IDs based on their titles. Used internally for posting new rows.
 
+    write_rows(sdk_method, rows: List[Row], ordered: bool=False, reverse: bool=False, chunk_size: int=None, **kwargs) -> List[Dict]:
+        The write engine under post_new_rows and update_rows: sends rows in write_chunk_size chunks w/ up to write_workers in flight,
+        retries only the chunks that were turned away (rate limit / 4004), and returns one result dict per chunk ('chunk', 'rows', 'attempts', 'response', 'error').
+        Ordered writes stop at the first chunk that still fails.
+
     delete_all_rows() -> None:
-        Deletes all rows in the current sheet.
+        Deletes all rows in the current sheet, only the row ids are fetched and they are deleted in delete_chunk_size chunks through write_rows.
 
     post_new_rows(posting_data: List[Dict[str, Any]], post_fresh: bool=False, post_to_top: bool=False) -> None:
         Posts new rows to the Smartsheet. Can optionally delete the whole sheet before posting or set the position of the new rows.
 
-    update_rows(posting_data: List[Dict[str, Any]], primary_key: str):
+    update_rows(posting_data: List[Dict[str, Any]], primary_key: str, update_type: str='default', diff: bool=False):
         Updates rows that can be updated, posts rows that do not map to the sheet.
+        'default' and 'batch' both go through write_rows, 'debug' sends (and prints) one row per request.
+        diff only sends the cells that differ from the sheet (see cell_matches), rows w/ nothing changed are skipped.
 
     grab_posting_row_ids(posting_data: List[Dict[str, Any]], primary_key: str):
         returns a new posting_data called update_data that is a dictionary whose key is the row id, and whose value is the dictionary for the row <column name>:<field value>
@@ -64,75 +179,231 @@ class grid:
     """
 
     token = None
-
-    def __init__(self, grid_id):
+    api_base = 'https://api.smartsheet.com/2.0'
+    # smartsheet allows 300 requests / minute per token
+    throttler = Throttler(rate=5, is_rate_limited=is_rate_limit_error, retry_after=rate_limit_retry_after)
+    perf = PerfRecorder()
+    # {(sheet id, sheet version): (column_df, {title: column id})}, only the newest version of each sheet is kept
+    column_cache = {}
+    column_cache_lock = threading.Lock()
+    snapshot_cache = None
+    # write engine settings (see write_rows), 350 rows has been a safe request size for our sheets.
+    # smartsheet answers concurrent writes to the same sheet w/ error 4004, all our chunks go to one sheet,
+    # so they go out one at a time unless write_workers is raised (the chunk retry absorbs the odd 4004)
+    write_chunk_size = 350
+    write_workers = 1
+    write_retries = 2
+    # row ids go in the delete url, 400 keeps it well under url length limits
+    delete_chunk_size = 400
+    summary_params=['title','createdAt', 'createdBy', 'displayValue', 'formula', 'id', 'index', 'locked', 'lockedForUser', 'modifiedAt', 'modifiedBy', 'objectValue', 'type']
+
+    def __init__(self, grid_id, incremental=False):
         self.grid_id = grid_id
         self.grid_content = None
+        self.incremental = incremental
+        # {projection key: snapshot}, see save_snapshot
+        self.snapshots = {}
         if self.token == None:
             return "MUST SET TOKEN"
         else:
-            self.smart = smartsheet.Smartsheet(access_token=self.token)
-            self.smart.errors_as_exceptions(True)
+            self.smart = smartsheet_client(self.token, self.api_base)
+    @classmethod
+    def api_call(cls, fn, *args, **kwargs):
+        '''runs an sdk call (ie self.smart.Sheets.get_sheet) through the shared throttler, timed in perf under the sdk method's name'''
+        with cls.perf.timed('smartsheet', getattr(fn, '__name__', 'call')) as info:
+            return cls.throttled(info, fn, *args, **kwargs)
+    @classmethod
+    def throttled(cls, info, fn, *args, **kwargs):
+        '''throttler.call(fn, ...), w/ the retries it took put in info (a perf.timed dict)
+        sdk models keep the http response they came from (request_response), when there is one its sizes go in info too'''
+        attempts = 0
+        def attempt():
+            nonlocal attempts
+            attempts += 1
+            return fn(*args, **kwargs)
+        try:
+            result = cls.throttler.call(attempt)
+        finally:
+            info['retries'] = max(0, attempts - 1)
+        response = getattr(result, 'request_response', None)
+        if response is not None:
+            info['bytes_received'] = len(response.content)
+            info['bytes_sent'] = len(response.request.body or '')
+        return result
 #region core get requests   
+    def get_sheet_json(self, **query_params):
+        '''GET /sheets/<id> w/ the sdk's session, auth, retries and exceptions, but returns the raw json as a dict
+        building sdk models and then .to_dict()-ing them is most of the cost of loading a big sheet, this skips both
+        query_params use the api's names (ie columnIds, rowsModifiedSince, include)'''
+        _op = fresh_operation("get_sheet")
+        _op["method"] = "GET"
+        _op["path"] = "/sheets/" + str(self.grid_id)
+        _op["query_params"].update({key: value for key, value in query_params.items() if value is not None})
+        def request():
+            result = self.smart.request_with_retry(self.smart.prepare_request(_op), _op)
+            if isinstance(result, OperationErrorResult):
+                # same exception the sdk itself would raise (w/ errors_as_exceptions), raised in here so the throttler retries rate limits
+                error = result.native("Error")
+                exception_class = getattr(importlib.import_module("smartsheet.exceptions"), error.result.name)
+                raise exception_class(error, str(error.result.code) + ": " + (error.result.message or "Unknown error"))
+            return result
+        with self.perf.timed('smartsheet', 'get_sheet_json') as info:
+            result = self.throttled(info, request)
+            info['bytes_received'] = len(result.resp.content)
+            content = result.resp.json()
+            info['rows'] = len(content.get("rows") or [])
+        return content
     def get_column_df(self):
         '''returns a df with data on the columns: title, type, options, etc...'''
         if self.token == None:
             return "MUST SET TOKEN"
         else:
             return pd.DataFrame.from_dict(
-                (self.smart.Sheets.get_columns(
+                (self.api_call(self.smart.Sheets.get_columns,
                     self.grid_id, 
                     level=2, 
                     include='objectValue', 
                     include_all=True)
                 ).to_dict().get("data"))
-    def fetch_content(self):
+    def get_column_metadata(self, version=None, columns=None):
+        '''returns (column_df, {title: column id}) for this sheet at `version`, only hitting the api when that version hasn't been seen yet
+        columns is the "columns" list of a get_sheet response, when given it is used instead of a get_columns call
+        version defaults to a (cheap) get_sheet_version call'''
+        if version is None:
+            version = self.api_call(self.smart.Sheets.get_sheet_version, self.grid_id).version
+        key = (self.grid_id, version)
+        with self.column_cache_lock:
+            cached = self.column_cache.get(key)
+        if cached is None:
+            column_df = pd.DataFrame.from_dict(columns) if columns is not None else self.get_column_df()
+            cached = (column_df, dict(zip(column_df['title'], column_df['id'])))
+            with self.column_cache_lock:
+                for old_key in [old_key for old_key in self.column_cache if old_key[0] == self.grid_id]:
+                    del self.column_cache[old_key]
+                self.column_cache[key] = cached
+        return cached
+    def fetch_content(self, incremental=None, column_titles=None, include_summary=False):
         '''this fetches data, ask coby why this is seperated
-        when this is done, there are now new objects created for various scenarios-- column_ids, row_ids, and the main sheet df'''
+        when this is done, there are now new objects created for various scenarios-- column_ids, row_ids, and the main sheet df
+        incremental (defaults to self.incremental): if there is a snapshot from an earlier fetch (on this instance or in grid.snapshot_cache),
+        only rows modified since then are downloaded and merged into it, an unchanged sheet costs one version check
+        column_titles: only these columns are requested from the api (titles not on the sheet are skipped, like df.filter would)
+        include_summary: the sheet summary fields come back in the same request and are put in self.summary_df
+        the sheet version is asked for at most once per fetch, the column lookup and the snapshot check share it'''
         if self.token == None:
             return "MUST SET TOKEN"
         else:
-            self.grid_content = (self.smart.Sheets.get_sheet(self.grid_id)).to_dict()
+            incremental = self.incremental if incremental is None else incremental
+            version = None
+            column_ids = None
+            if column_titles is not None:
+                # an already fetched grid resolves titles against its last version, otherwise ask once and let the snapshot check reuse it
+                if incremental or getattr(self, 'grid_version', None) is None:
+                    version = self.api_call(self.smart.Sheets.get_sheet_version, self.grid_id).version
+                column_ids = self.resolve_column_ids(column_titles, version)
+            include = "summary" if include_summary else None
+            snapshot_key = self.snapshot_key(column_ids, include)
+            snapshot = self.load_snapshot(snapshot_key) if incremental else None
+            if snapshot is None or not self.refresh_snapshot(snapshot, column_ids, include, version):
+                self.grid_content = self.get_sheet_json(columnIds=column_ids, include=include)
+                # note that the df's values are equivelant to the cell's 'Display Value'
+                self.df = sheet_content_to_df(self.grid_content)
             self.grid_name = (self.grid_content).get("name")
             self.grid_url = (self.grid_content).get("permalink")
+            self.grid_version = (self.grid_content).get("version")
             # this attributes pulls the column headers
             self.grid_columns = [i.get("title") for i in (self.grid_content).get("columns")]
-            # note that the grid_rows is equivelant to the cell's 'Display Value'
-            self.grid_rows = []
-            if (self.grid_content).get("rows") == None:
-                self.grid_rows = []
-            else:
-                for i in (self.grid_content).get("rows"):
-                    b = i.get("cells")
-                    c = []
-                    for i in b:
-                        l = i.get("displayValue")
-                        m = i.get("value")
-                        if l == None:
-                            c.append(m)
-                        else:
-                            c.append(l)
-                    (self.grid_rows).append(c)
-            
-            # resulting fetched content
-            self.grid_rows = self.grid_rows
-            if (self.grid_content).get("rows") == None:
-                self.grid_row_ids = []
-            else:
-                self.grid_row_ids = [i.get("id") for i in (self.grid_content).get("rows")]
             self.grid_column_ids = [i.get("id") for i in (self.grid_content).get("columns")]
-            self.df = pd.DataFrame(self.grid_rows, columns=self.grid_columns)
-            # Should be row_id intead of id as that is less likely to be taken name space!!!
-            self.df["id"]=self.grid_row_ids
-            self.column_df = self.get_column_df()
+            self.grid_row_ids = self.df["id"].tolist()
+            if include_summary:
+                summary_fields = ((self.grid_content).get("summary") or {}).get("fields") or []
+                self.summary_df = pd.DataFrame([[field.get(param) for param in self.summary_params] for field in summary_fields], columns=self.summary_params)
+            # columns already came back w/ the sheet, so there is no second round trip for them
+            # a projected response only has some of the columns, those can't go in the column cache
+            self.column_df, self.column_title_to_id = self.get_column_metadata(self.grid_version, self.grid_content.get("columns") if column_ids is None else None)
+            if incremental:
+                self.save_snapshot(snapshot_key)
+    def resolve_column_ids(self, column_titles, version=None):
+        '''column ids (in the order given) for the titles that are on the sheet, version defaults to the one from the last fetch'''
+        _, column_title_to_id = self.get_column_metadata(version if version is not None else getattr(self, 'grid_version', None))
+        return [column_title_to_id[title] for title in column_titles if title in column_title_to_id]
+    def fetch_row_ids(self, columns=None):
+        '''row ids in sheet order, asks for only the primary column so no other cell data comes back
+        columns is the "columns" list of a get_sheet response, if not given it comes from the column metadata'''
+        if columns is None:
+            columns = self.get_column_metadata(getattr(self, 'grid_version', None))[0].to_dict('records')
+        primary_column = next((column for column in columns if column.get("primary") == True), columns[0])
+        content = self.get_sheet_json(columnIds=primary_column.get("id"))
+        return [row.get("id") for row in content.get("rows") or []]
+    #region incremental snapshots
+    def snapshot_key(self, column_ids=None, include=None):
+        '''one snapshot per sheet and column projection (and include), so fetching different columns of the same sheet don't overwrite each other'''
+        key = f"sheet_{self.grid_id}"
+        if column_ids is not None:
+            # hashed, a few column ids spelled out are already past the file name limit of grid.snapshot_cache
+            key += "_" + hashlib.sha1("_".join(str(column_id) for column_id in sorted(column_ids)).encode()).hexdigest()[:16]
+        if include is not None:
+            key += f"_{include}"
+        return key
+    def load_snapshot(self, key):
+        if key not in self.snapshots and self.snapshot_cache is not None:
+            self.snapshots[key] = self.snapshot_cache.load(key)
+        return self.snapshots.get(key)
+    def save_snapshot(self, key):
+        '''keeps the sheet's metadata (version, modifiedAt, columns... everything but the rows) and the df'''
+        # a copy, callers are free to edit self.df after a fetch
+        self.snapshots[key] = {'meta': {field: value for field, value in self.grid_content.items() if field != "rows"}, 'df': self.df.copy()}
+        if self.snapshot_cache is not None:
+            self.snapshot_cache.save(key, self.snapshots[key])
+    def refresh_snapshot(self, snapshot, column_ids=None, include=None, version=None):
+        '''brings the snapshot up to date by merging in rows modified since it was taken, deleted rows are dropped
+        sets self.grid_content (w/ only the modified rows) and self.df, returns False if a full fetch is needed instead (ie the columns changed)
+        version is the sheet's current version if the caller already asked for it
+        a formula/cross sheet recalculation changes the version but not the rows' modifiedAt, so a changed sheet w/ formula or system columns
+        (or one where no modified rows come back) gets a full fetch'''
+        meta, df = snapshot['meta'], snapshot['df']
+        if version is None:
+            version = self.api_call(self.smart.Sheets.get_sheet_version, self.grid_id).version
+        if version == meta.get("version"):
+            self.grid_content = dict(meta, rows=[])
+            self.df = df.copy()
+            return True
+        if meta.get("modifiedAt") is None:
+            return False
+        if any(column.get("formula") or column.get("systemColumnType") for column in meta.get("columns")):
+            return False
+        # a second of overlap, re-merging a row we already have is harmless, missing one is not
+        since = datetime.datetime.fromisoformat(meta["modifiedAt"].replace("Z", "+00:00")) - datetime.timedelta(seconds=1)
+        content = self.get_sheet_json(rowsModifiedSince=since.isoformat(), columnIds=column_ids, include=include)
+        if [(column.get("id"), column.get("title")) for column in content.get("columns")] != [(column.get("id"), column.get("title")) for column in meta.get("columns")]:
+            return False
+        if not content.get("rows"):
+            # the version moved but no row did, something changed that rowsModifiedSince can't see
+            return False
+        changed = sheet_content_to_df(content)
+        known_ids = set(df['id'])
+        added_rows = sorted([row for row in content.get("rows") or [] if row.get("id") not in known_ids], key=lambda row: row.get("rowNumber", 0))
+        # when nothing was deleted and new rows only went on the bottom, the order is known, otherwise ask for it
+        appended_only = all(row.get("rowNumber", 0) > len(df) for row in added_rows)
+        if appended_only and content.get("totalRowCount") == len(df) + len(added_rows):
+            row_order = df['id'].tolist() + [row.get("id") for row in added_rows]
+        else:
+            row_order = self.fetch_row_ids(content.get("columns"))
+        merged = pd.concat([df[~df['id'].isin(changed['id'])], changed], ignore_index=True).set_index('id', drop=False)
+        if not set(row_order).issubset(merged.index):
+            # rows were added between the two calls, start over
+            return False
+        self.grid_content = content
+        self.df = merged.loc[row_order].reset_index(drop=True)
+        return True
+    #endregion
     def fetch_summary_content(self):
         '''builds the summary df for summary columns'''
         if self.token == None:
             return "MUST SET TOKEN"
         else:
-            self.grid_content = (self.smart.Sheets.get_sheet_summary_fields(self.grid_id)).to_dict()
+            self.grid_content = (self.api_call(self.smart.Sheets.get_sheet_summary_fields, self.grid_id)).to_dict()
             # this attributes pulls the column headers
-            self.summary_params=['title','createdAt', 'createdBy', 'displayValue', 'formula', 'id', 'index', 'locked', 'lockedForUser', 'modifiedAt', 'modifiedBy', 'objectValue', 'type']
             self.grid_rows = []
             if (self.grid_content).get("data") == None:
                 self.grid_rows = []
@@ -162,35 +433,90 @@ class grid:
             self.reduced_column_names = list(self.column_reduction.title)
 #endregion
 #region ss post
+    #region write engine
+    def write_rows(self, sdk_method, rows, ordered=False, reverse=False, chunk_size=None, **kwargs):
+        '''sends rows w/ sdk_method (ie self.smart.Sheets.update_rows or add_rows) in write_chunk_size (or chunk_size) chunks, w/ up to write_workers chunks in flight
+        kwargs go to every sdk_method call
+        ordered sends the chunks one at a time in order (adds, so the rows land in the order given), reverse sends the last chunk first (adds to top)
+        a chunk smartsheet turned away (see is_retryable_write_error) is retried (on its own) up to write_retries times w/ backoff, other errors are not retried
+        unordered chunks are retried after the rest went out, an ordered chunk is retried before the next one and if it still fails the rest are not sent (attempts 0)
+        returns one dict per chunk: {'chunk': n, 'rows': row count, 'attempts': n, 'response': sdk result or None, 'error': exception or None}
+        and keeps them as self.write_results, if any chunk still failed its error is raised once the sending stopped'''
+        chunk_size = chunk_size or self.write_chunk_size
+        chunks = [rows[i:i + chunk_size] for i in range(0, len(rows), chunk_size)]
+        results = [{'chunk': i + 1, 'rows': len(chunk), 'attempts': 0, 'response': None, 'error': None} for i, chunk in enumerate(chunks)]
+        order = list(range(len(chunks)))
+        if reverse:
+            order.reverse()
+
+        def send(i):
+            results[i]['attempts'] += 1
+            try:
+                with self.perf.timed('smartsheet', sdk_method.__name__, rows=len(chunks[i])) as info:
+                    results[i]['response'] = self.throttled(info, sdk_method, self.grid_id, chunks[i], **kwargs)
+                results[i]['error'] = None
+            except Exception as e:
+                results[i]['error'] = e
+            if len(chunks) > 1:
+                status = 'failed' if results[i]['error'] is not None else 'sent'
+                print(f"Chunk {i + 1}/{len(chunks)}: {status} {len(chunks[i])} rows ({sdk_method.__name__})")
+
+        def retry(indexes):
+            for attempt in range(self.write_retries):
+                failed = [i for i in indexes if is_retryable_write_error(results[i]['error'])]
+                if not failed:
+                    break
+                time.sleep(self.throttler.backoff_delay(attempt))
+                # retries go out one at a time, they most likely failed from colliding w/ another write
+                for i in failed:
+                    send(i)
+
+        if ordered:
+            for i in order:
+                send(i)
+                retry([i])
+                if results[i]['error'] is not None:
+                    # the chunks after it would land out of order, so they stay unsent
+                    break
+        else:
+            workers = max(1, min(self.write_workers, len(chunks)))
+            if workers == 1:
+                for i in order:
+                    send(i)
+            else:
+                with ThreadPoolExecutor(max_workers=workers) as executor:
+                    list(executor.map(send, order))
+            retry(order)
+
+        self.write_results = results
+        for result in results:
+            if result['error'] is not None:
+                raise result['error']
+        return results
+    #endregion
     #region new row(s)
     def grab_posting_column_ids(self, filtered_column_title_list="all_columns"):
         '''preps for ss post 
         creating a dictionary per column:
         { <title of column> : <column id> }
         filtered column title list is a list of column title str to prep for posting (if you are not posting to all columns)
-        [NOT USED INDEPENDENTLY, BUT USED INSIDE OF POST_NEW_ROWS]'''
+        [NOT USED INDEPENDENTLY, BUT USED INSIDE OF POST_NEW_ROWS]
+        raises KeyError if a title is not a column on the sheet'''
 
-        column_df = self.get_column_df()
+        # the version from this instance's last fetch_content (if there was one) saves a version check
+        column_df, column_title_to_id = self.get_column_metadata(getattr(self, 'grid_version', None))
 
         if filtered_column_title_list == "all_columns":
             filtered_column_title_list = column_df['title'].tolist()
     
-        self.column_id_dict = {title: column_df.loc[column_df['title'] == title]['id'].tolist()[0] for title in filtered_column_title_list}
+        self.column_id_dict = {title: column_title_to_id[title] for title in filtered_column_title_list}
     def delete_all_rows(self):
-        '''deletes up to 400 rows in 200 row chunks by grabbing row ids and deleting them one at a time in a for loop
+        '''deletes every row on the sheet, grabbing just the row ids (no cell data) and deleting them in delete_chunk_size chunks through write_rows
+        rows that are already gone are ignored, so a retried chunk doesn't fail on the rows it did delete
         [NOT USED INDEPENDENTLY, BUT USED INSIDE OF POST_NEW_ROWS]'''
-        self.fetch_content()
-
-        row_list_del = []
-        for rowid in self.df['id'].to_list():
-            row_list_del.append(rowid)
-            # Delete rows to sheet by chunks of 200
-            if len(row_list_del) > 199:
-                self.smart.Sheets.delete_rows(self.grid_id, row_list_del)
-                row_list_del = []
-        # Delete remaining rows
-        if len(row_list_del) > 0:
-            self.smart.Sheets.delete_rows(self.grid_id, row_list_del) 
+        row_ids = self.fetch_row_ids()
+        print(f"deleting {len(row_ids)} rows from {self.grid_id}")
+        self.delete_response = self.write_rows(self.smart.Sheets.delete_rows, row_ids, chunk_size=self.delete_chunk_size, ignore_rows_not_found=True)
     def post_new_rows(self, posting_data, post_fresh = False, post_to_top=False):
         '''posts new row to sheet, does not account for various column types at the moment
         posting data is a list of dictionaries, one per row, where the key is the name of the column, and the value is the value you want to post
@@ -199,11 +525,10 @@ class grid:
         post_fresh = first delete the whole sheet, then post (else it will just update existing sheet)
         TODO: if using post_to_top==False, I should really delete the empty rows in the sheet so it will properly post to bottom'''
         
-        posting_sheet_id = self.grid_id
         column_title_list = list(posting_data[0].keys())
         try:
             self.grab_posting_column_ids(column_title_list)
-        except IndexError:
+        except (IndexError, KeyError):
             raise ValueError("Index Error reveals that your posting_data dictionary has key(s) that don't match the column names on the Smartsheet")
         if post_fresh:
             self.delete_all_rows()
@@ -222,7 +547,8 @@ class grid:
                     })
             rows.append(row)
 
-        self.post_response = self.smart.Sheets.add_rows(posting_sheet_id, rows)
+        # ordered so the rows land in the order given, to top sends the last chunk first so the first chunk ends up on top
+        self.post_response = self.write_rows(self.smart.Sheets.add_rows, rows, ordered=True, reverse=post_to_top)
     #endregion
     #region post timestamp
     def handle_update_stamps(self):
@@ -248,7 +574,7 @@ class grid:
                 "title": field_name_str,
                 "type": sum_type
             })
-            response = self.smart.Sheets.add_sheet_summary_fields(self.grid_id, [new_field])
+            response = self.api_call(self.smart.Sheets.add_sheet_summary_fields, self.grid_id, [new_field])
             # Assuming the response has the created field's data, extract its ID
             self.sum_id = response.data[0].id
         else:
@@ -265,7 +591,7 @@ class grid:
             "id": int(sum_id),
             "ObjectValue": post
         })
-        resp = self.smart.Sheets.update_sheet_summary_fields(
+        resp = self.api_call(self.smart.Sheets.update_sheet_summary_fields,
             self.grid_id,    # sheet_id
             [sum],
             False    # rename_if_conflict
@@ -285,9 +611,10 @@ class grid:
         1. Identify the value associated with the `primary_key` in `posting_data`.
         2. Search for this value in the Smartsheet to find its row_id.
         3. Return a dictionary: keys are row_ids (or "new_rows" for unmatched rows), values are the corresponding `posting_data` for each row.
+        only the columns being posted are fetched
         '''
 
-        self.fetch_content()
+        self.fetch_content(column_titles=list(dict.fromkeys([primary_key, *posting_data[0].keys()])))
 
         if not self.df.empty:
             # Mapping of the primary key values to their corresponding row IDs from the current Smartsheet data
@@ -315,119 +642,72 @@ class grid:
             return update_data
         else:
             raise ValueError("Grid Instance is not appropriate for this task. Try create a new grid instance")
-    def update_rows(self, posting_data, primary_key, update_type='default'):
+    def build_update_row(self, row_id, primary_key, column_names=None):
+        '''the update Row for one row of self.update_data, every posted column but the primary key (None is posted as "" so the post goes through)
+        column_names limits the row to those columns'''
+        new_row = smartsheet.models.Row()
+        new_row.id = row_id
+        for column_name in self.column_id_dict.keys():
+            # does not post repost primary key
+            if column_name != primary_key and (column_names is None or column_name in column_names):
+                new_cell = smartsheet.models.Cell()
+                new_cell.column_id = int(self.column_id_dict[column_name])
+                value = self.update_data[row_id].get(column_name)
+                new_cell.value = value if value != None else ""
+                new_cell.strict = False
+                new_row.cells.append(new_cell)
+        return new_row
+    def changed_columns(self, primary_key):
+        '''{row id: [titles of the posted columns whose cell differs from the sheet]} for the matched rows of self.update_data, rows w/ no changes are left out
+        compares against self.df, which grab_posting_row_ids just fetched'''
+        columns = [column_name for column_name in self.column_id_dict.keys() if column_name != primary_key]
+        current = self.df.drop_duplicates('id').set_index('id')
+        changed = {}
+        for row_id, data in self.update_data.items():
+            if row_id == "new_rows":
+                continue
+            row = current.loc[row_id]
+            row_changes = [column_name for column_name in columns if not cell_matches(row[column_name], data.get(column_name))]
+            if row_changes:
+                changed[row_id] = row_changes
+        return changed
+    def update_rows(self, posting_data, primary_key, update_type='default', diff=False):
         '''
         Updates rows (and adds misc rows) in the Smartsheet based on the provided posting data.  
 
         Parameters:
         - posting_data (list of dicts)
         - primary_key (string which is equal to a key of one of the items in all dictionaries)
+        - diff (bool) only write the cells that differ from what is on the sheet now, skipping unchanged rows
 
         Returns:
         None. Updates and possibly adds rows in the Smartsheet.
         '''
-        posting_sheet_id = self.grid_id
         column_title_list = list(posting_data[0].keys())
+        # rows first, the fetch caches the column metadata for the current version so the column ids below are free
+        self.update_data = self.grab_posting_row_ids(posting_data, primary_key)
         try:
             self.grab_posting_column_ids(column_title_list)
-        except IndexError:
+        except (IndexError, KeyError):
             raise ValueError("Index Error reveals that your posting_data dictionary has key(s) that don't match the column names on the Smartsheet")
-        self.update_data = self.grab_posting_row_ids(posting_data, primary_key)
-
-        if update_type =='debug':
-            # Handle existing rows' updates (printing each row)
-            for i, row_id in enumerate(self.update_data.keys()):
-                if row_id != "new_rows":
-                    # Build the row to update
-                    new_row = smartsheet.models.Row()
-                    new_row.id = row_id
-                    for column_name in self.column_id_dict.keys():
-                        # does not post repost primary key
-                        if column_name != primary_key:
-                            # Build new cell value
-                            new_cell = smartsheet.models.Cell()
-                            new_cell.column_id = int(self.column_id_dict[column_name])
-                            # stops error where post doesnt go through because value is "None"
-                            if self.update_data[row_id].get(column_name) != None:
-                                print(f"{i+1}/{len(self.update_data.keys())}  ", self.update_data[row_id].get(column_name))
-                                new_cell.value = self.update_data[row_id].get(column_name)
-                            else:
-                                new_cell.value = ""
-                            new_cell.strict = False
-                            new_row.cells.append(new_cell)
-
-                    # Update rows
-                    self.update_response = self.smart.Sheets.update_rows(
-                      posting_sheet_id ,      # sheet_id
-                      [new_row])
-                    
-        elif update_type == 'batch':
-            rows = []
-            counter = 1
-            batch_total = int(math.ceil(len(self.update_data.keys()) / 350))
-            self.update_response = []       
-
-            for i, row_id in enumerate(self.update_data.keys()):
-                if row_id != "new_rows":
-                    new_row = smartsheet.models.Row()
-                    new_row.id = row_id
-                    for column_name in self.column_id_dict.keys():
-                        if column_name != primary_key:
-                            new_cell = smartsheet.models.Cell()
-                            new_cell.column_id = int(self.column_id_dict[column_name])
-                            new_cell.value = self.update_data[row_id].get(column_name, "")  # Use get method to handle None
-                            new_cell.strict = False
-                            new_row.cells.append(new_cell)
-                    rows.append(new_row)  # Properly add the new_row to the rows list       
-
-                # When 350 rows are collected or at the end of the data
-                if (i + 1) % 350 == 0 or (i + 1) == len(self.update_data.keys()):
-                    # Send the batch update
-                    self.update_response.append(self.smart.Sheets.update_rows(
-                        posting_sheet_id,
-                        rows  # Now passing the entire list of rows
-                    ))
-                    print(f"Batch {counter}/{batch_total}: updated {i + 1}/{len(self.update_data.keys())} in smartsheet")
-                    time.sleep(2)  # Optional: sleep to avoid hitting rate limits or as needed
-                    counter += 1
-                    rows = []  # Reset the rows list for the next batch     
-
-            # After the loop, check if there's any leftover rows to update
-            if rows:
-                self.update_response.append(self.smart.Sheets.update_rows(
-                    posting_sheet_id,
-                    rows
-                ))
-                print(f"Final batch: updated remaining {len(rows)} rows in smartsheet")
 
-        
-        elif update_type == 'default':
-            rows = []
-            # Handle existing rows' updates
-            for row_id in self.update_data.keys():
-                if row_id != "new_rows":
-                    # Build the row to update
-                    new_row = smartsheet.models.Row()
-                    new_row.id = row_id
-                    for column_name in self.column_id_dict.keys():
-                        # does not post repost primary key
-                        if column_name != primary_key:
-                            # Build new cell value
-                            new_cell = smartsheet.models.Cell()
-                            new_cell.column_id = int(self.column_id_dict[column_name])
-                            # stops error where post doesnt go through because value is "None"
-                            if self.update_data[row_id].get(column_name) != None:
-                                new_cell.value = self.update_data[row_id].get(column_name)
-                            else:
-                                new_cell.value = ""
-                            new_cell.strict = False
-                            new_row.cells.append(new_cell)
-                    rows.append(new_row)
-
-            # Update rows
-            self.update_response = self.smart.Sheets.update_rows(
-              posting_sheet_id ,      # sheet_id
-              rows)
+        if diff:
+            changed = self.changed_columns(primary_key)
+            matched = len(self.update_data) - ('new_rows' in self.update_data)
+            print(f"{len(changed)}/{matched} matched rows changed ({sum(len(columns) for columns in changed.values())} cells to write)")
+            rows = [self.build_update_row(row_id, primary_key, columns) for row_id, columns in changed.items()]
+        else:
+            rows = [self.build_update_row(row_id, primary_key) for row_id in self.update_data.keys() if row_id != "new_rows"]
+
+        if update_type == 'debug':
+            # one request per row (printing each) to find the row smartsheet is rejecting
+            self.update_response = []
+            for i, row in enumerate(rows):
+                print(f"{i+1}/{len(rows)}  ", self.update_data[row.id])
+                self.update_response.append(self.api_call(self.smart.Sheets.update_rows, self.grid_id, [row]))
+        else:
+            # 'batch' and 'default' used to be separate paths (350 row chunks w/ a sleep vs one big request), both are chunked now
+            self.update_response = self.write_rows(self.smart.Sheets.update_rows, rows)
 
         try:
             # Handle addition of new rows if the "new_rows" key is present
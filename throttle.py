@@ -0,0 +1,100 @@
+import threading
+import time
+
+class Throttler:
+    """
+    An adaptive token bucket that paces calls to one API (one instance per API, shared by every caller/thread).
+
+    Calls take a token before going out; tokens refill at `rate` per second up to `burst`.
+    When the API answers with a rate limit (429), every caller is paused for the Retry-After time
+    (or an exponential backoff if there is none) and the rate is halved, then it creeps back up
+    toward max_rate as calls succeed. This replaces guessed time.sleep()s with the actual allowed rate.
+
+    Attributes:
+    -----------
+    rate : float
+        current calls per second.
+    max_rate / min_rate : float
+        bounds the adaptive rate moves between.
+    burst : int
+        how many calls can go out back to back after an idle period.
+    max_retries : int
+        how many times a rate limited call is retried before giving up.
+    is_rate_limited / retry_after : callable, optional
+        for call(): is_rate_limited(error) says if an exception is a rate limit, retry_after(error) digs the Retry-After value out of it (None if there is none).
+
+    Methods:
+    --------
+    acquire() -> None:
+        blocks until the caller is allowed to make a call.
+    reserve() -> float:
+        takes the caller's turn w/o blocking, returns the seconds to wait before making the call (for asyncio callers, see rm_client.AsyncRmClient).
+    call(fn, *args, **kwargs):
+        runs fn under the throttle, retrying (after the error's Retry-After, or a backoff) when it raises an error is_rate_limited recognizes.
+    on_rate_limited(delay) / on_success() -> None:
+        feedback from the caller, used by clients that check responses themselves (see rm_client.RmClient).
+    backoff_delay(attempt, retry_after=None) -> float:
+        seconds to wait before retry number `attempt`, honoring a Retry-After header when there is one.
+    """
+
+    def __init__(self, rate, burst=None, min_rate=0.5, max_retries=5, backoff=1.0, max_backoff=60, is_rate_limited=None, retry_after=None):
+        self.max_rate = rate
+        self.rate = rate
+        self.min_rate = min_rate
+        self.burst = burst if burst is not None else max(1, int(rate))
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.is_rate_limited = is_rate_limited or (lambda error: False)
+        self.retry_after = retry_after or (lambda error: None)
+        self.tokens = self.burst
+        self.updated = time.monotonic()
+        self.paused_until = 0
+        self.retries = 0
+        self.lock = threading.Lock()
+    def reserve(self):
+        '''takes a token (going negative reserves a future one), returns how long until that token would exist'''
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= 1
+            return max(0, -self.tokens / self.rate, self.paused_until - now)
+    def acquire(self):
+        '''takes a token and sleeps until that token would exist'''
+        wait = self.reserve()
+        if wait > 0:
+            time.sleep(wait)
+    def on_rate_limited(self, delay):
+        '''pauses every caller for delay seconds and halves the rate'''
+        with self.lock:
+            self.paused_until = max(self.paused_until, time.monotonic() + delay)
+            self.rate = max(self.min_rate, self.rate / 2)
+            self.retries += 1
+    def on_success(self):
+        '''slowly climbs back to max_rate after being rate limited'''
+        if self.rate < self.max_rate:
+            with self.lock:
+                self.rate = min(self.max_rate, self.rate + self.max_rate * 0.05)
+    def backoff_delay(self, attempt, retry_after=None):
+        if retry_after is not None:
+            try:
+                return min(self.max_backoff, max(0, float(retry_after)))
+            except ValueError:
+                # http-date style retry-after, just fall back to backoff
+                pass
+        return min(self.max_backoff, self.backoff * (2 ** attempt))
+    def call(self, fn, *args, **kwargs):
+        attempt = 0
+        while True:
+            self.acquire()
+            try:
+                result = fn(*args, **kwargs)
+            except Exception as e:
+                if attempt < self.max_retries and self.is_rate_limited(e):
+                    self.on_rate_limited(self.backoff_delay(attempt, self.retry_after(e)))
+                    attempt += 1
+                    continue
+                raise
+            self.on_success()
+            return result